@@ -10,7 +10,7 @@ import tempfile
 import time
 import subprocess
 from collections import deque # 用于音量计平滑
-import queue # 用于线程间音量数据传输
+import queue # 用于录音数据的线程间传输
 
 # PyQt5 核心模块导入
 from PyQt5.QtWidgets import (QDialog, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
@@ -27,12 +27,72 @@ except ImportError:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'modules')))
     from plugin_system import BasePlugin
 
+# ==============================================================================
+# 音量计环形缓冲区
+# 音频回调线程只向预分配的环形缓冲区写入样本，UI 线程按写指针读取最近的样本，
+# 避免在实时音频回调中为每一帧分配新的 numpy 数组。
+# ==============================================================================
+VOLUME_RING_FRAMES = 8192  # 每个设备环形缓冲区的容量（帧）
+VOLUME_METER_FRAMES = 1024 # 每次计算音量时读取的最近帧数
+_DB_SCALE = 100.0 / 60.0   # 将 -60dBFS~0dBFS 映射到 0~100 的比例系数
+
+def _to_mono_float32(indata):
+    """在音频源头把输入块统一转换为 float32 单声道，单声道时只返回视图而不复制。"""
+    if indata.ndim == 1:
+        mono = indata
+    elif indata.shape[1] == 1:
+        mono = indata[:, 0]
+    else:
+        mono = indata.mean(axis=1, dtype=np.float32)
+    return mono.astype(np.float32, copy=False)
+
+class VolumeRingBuffer:
+    """
+    单生产者/单消费者 (SPSC) 的 float32 环形缓冲区。
+    写入方为音频回调线程，读取方为 UI 线程；写指针的赋值在 CPython 的 GIL 下是原子的。
+    """
+    def __init__(self, frames=VOLUME_RING_FRAMES):
+        self._ring = np.zeros(frames, dtype=np.float32)
+        self._write_idx = 0
+        self._read_buf = np.empty(VOLUME_METER_FRAMES, dtype=np.float32) # 跨越环尾时使用的预分配读取缓冲
+
+    def write(self, samples):
+        """将一段 float32 单声道样本（由 _to_mono_float32 在生产端保证类型）写入环形缓冲区，返回新的写指针。"""
+        ring = self._ring
+        size = ring.shape[0]
+        n = samples.shape[0]
+        if n >= size:
+            ring[:] = samples[n - size:]
+            self._write_idx = 0
+            return 0
+        w = self._write_idx
+        end = w + n
+        if end <= size:
+            ring[w:end] = samples
+        else:
+            first = size - w
+            ring[w:] = samples[:first]
+            ring[:n - first] = samples[first:]
+        self._write_idx = end % size
+        return self._write_idx
+
+    def latest(self, write_idx, frames=VOLUME_METER_FRAMES):
+        """返回写指针 write_idx 之前最近的 frames 帧（尽量返回视图，不分配新数组）。"""
+        frames = min(frames, self._read_buf.shape[0])
+        if write_idx >= frames:
+            return self._ring[write_idx - frames:write_idx]
+        head = frames - write_idx
+        out = self._read_buf[:frames]
+        out[:head] = self._ring[-head:]
+        out[head:] = self._ring[:write_idx]
+        return out
+
 # ==============================================================================
 # 后台测试线程
 # 负责并行监听多个音频设备，实时报告音量，并捕获设备打开错误。
 # ==============================================================================
 class TestWorker(QThread):
-    volume_update = pyqtSignal(int, np.ndarray) # 信号传递 numpy 数组
+    volume_update = pyqtSignal(int, int) # 信号只传递设备索引和环形缓冲区的写指针
     device_error = pyqtSignal(int, str)    # 设备打开错误信号: device_index, error_message
     device_disable_request = pyqtSignal(int) # 请求禁用设备的信号: device_index
     test_finished = pyqtSignal(dict)       # 所有设备测试完成信号: results_dict
@@ -51,6 +111,8 @@ class TestWorker(QThread):
         self.detected_sound = set() # 记录哪些设备检测到了有效声音
         self.opened_streams_info = {} # 存储成功打开设备的原始信息
         self.SILENCE_THRESHOLD_RMS = 0.002 # 使用与 SampleAnalysisWorker 一致的、更灵敏的阈值
+        # 为每个设备预分配音量计环形缓冲区，供 UI 线程读取
+        self.rings = {dev['index']: VolumeRingBuffer() for dev in devices_to_test}
 
     def run(self):
         """线程主入口点，执行音频设备的并行监听。"""
@@ -61,6 +123,7 @@ class TestWorker(QThread):
                     stream = sd.InputStream(
                         device=dev['index'],
                         channels=1,
+                        dtype='float32',
                         samplerate=dev['default_samplerate'],
                         callback=lambda indata, f, t, s, index=dev['index']: self.audio_callback(indata, index)
                     )
@@ -106,10 +169,12 @@ class TestWorker(QThread):
 
     def audio_callback(self, indata, device_index):
         if not self._is_running: return
-        self.volume_update.emit(device_index, indata.copy())
+        mono = _to_mono_float32(indata)
+        write_idx = self.rings[device_index].write(mono)
+        self.volume_update.emit(device_index, write_idx)
         
         # 使用 RMS 值进行声音检测，与样本分析保持一致
-        rms = np.sqrt(np.mean(np.square(indata)))
+        rms = np.sqrt(np.dot(mono, mono) / mono.shape[0]) if mono.shape[0] else 0.0
         if rms > self.SILENCE_THRESHOLD_RMS:
             self.detected_sound.add(device_index)
 
@@ -122,7 +187,7 @@ class TestWorker(QThread):
 # ==============================================================================
 class RecordingWorker(QThread):
     recording_finished = pyqtSignal(bool, str) # 录制完成信号: success, filepath_or_error
-    volume_update = pyqtSignal(int, np.ndarray) # 信号传递 numpy 数组
+    volume_update = pyqtSignal(int, int) # 信号只传递设备索引和环形缓冲区的写指针
 
     def __init__(self, device_info, filepath):
         """
@@ -135,18 +200,21 @@ class RecordingWorker(QThread):
         self.filepath = filepath
         self._is_running = False
         self.audio_data_queue = queue.Queue() # 使用队列进行线程间数据传输
+        self.rings = {device_info['index']: VolumeRingBuffer()} # 音量计环形缓冲区
 
     def run(self):
         self._is_running = True
         try:
             samplerate = int(self.device_info['default_samplerate'])
+            device_index = self.device_info['index']
+            ring = self.rings[device_index]
             
             def callback(indata, frames, time, status):
                 if self._is_running: # 只有在线程被标记为运行时才收集数据
                     self.audio_data_queue.put(indata.copy())
-                    self.volume_update.emit(self.device_info['index'], indata.copy())
+                    self.volume_update.emit(device_index, ring.write(_to_mono_float32(indata)))
 
-            with sd.InputStream(device=self.device_info['index'], channels=1, samplerate=samplerate, callback=callback):
+            with sd.InputStream(device=self.device_info['index'], channels=1, dtype='float32', samplerate=samplerate, callback=callback):
                 while self._is_running: # 持续录制，直到外部调用 stop()
                     self.msleep(100) # 短暂休眠，避免CPU空转，等待 stop() 信号
             
@@ -421,7 +489,9 @@ class TesterDialog(QDialog):
         self.sample_filepath = os.path.join(tempfile.gettempdir(), "phonacq_test_sample.wav") # 临时文件路径
 
         # 音量计平滑处理所需的状态变量
-        self.volume_meter_queues = {}  # {device_id: queue}
+        self.volume_rings = {}         # {device_id: VolumeRingBuffer}
+        self.volume_write_idx = {}     # {device_id: 最新写指针}
+        self.volume_read_idx = {}      # {device_id: 上次读取时的写指针}
         self.volume_histories = {}     # {device_id: deque}
         self.volume_update_timer = QTimer(self)
         self.volume_update_timer.timeout.connect(self.update_all_volume_meters)
@@ -536,6 +606,9 @@ class TesterDialog(QDialog):
                     custom_name = config.get("name")
                     status = config.get("status", "untested")
                     display_name = f"{custom_name}" if custom_name else dev['name']
+                    # 缓存事件处理中常用的派生字段，避免每次事件都重新查询配置
+                    dev['_id_str'] = device_id
+                    dev['_disabled'] = config.get("disabled", False)
 
                     status_icon_label = QLabel(); status_icon_label.setFixedSize(24, 24)
                     
@@ -569,12 +642,22 @@ class TesterDialog(QDialog):
 
     def update_status_icon(self, device_id, status, error_msg=None):
         if device_id not in self.device_widgets: return
+        self._apply_status_visual(device_id, status, error_msg)
+        
+        config = self.plugin.device_config.setdefault(str(device_id), {})
+        config['status'] = status
+        if error_msg: config['error_msg'] = error_msg
+        else: config.pop('error_msg', None)
+        
+        self._save_config_only()
+
+    def _apply_status_visual(self, device_id, status, error_msg=None):
+        """只根据状态刷新设备的图标、工具提示和文字样式，不修改也不保存配置。"""
         info = self.device_widgets[device_id]
         icon_label = info['status_icon']; icon = None; tooltip = ""
         
         # 首先获取设备的禁用状态
-        config = self.plugin.device_config.setdefault(str(device_id), {})
-        is_disabled = config.get("disabled", False)
+        is_disabled = self.plugin.device_config.get(str(device_id), {}).get("disabled", False)
 
         # 默认清除样式
         info['label'].setStyleSheet("")
@@ -599,12 +682,6 @@ class TesterDialog(QDialog):
         
         if icon: icon_label.setPixmap(icon.pixmap(24, 24)); icon_label.setToolTip(tooltip)
         else: icon_label.clear(); icon_label.setToolTip(tooltip or "此设备尚未测试。")
-        
-        config['status'] = status
-        if error_msg: config['error_msg'] = error_msg
-        else: config.pop('error_msg', None)
-        
-        self._save_config_only()
 
     def _save_config_only(self):
         """只保存插件的设备配置到文件，不刷新任何UI。"""
@@ -634,9 +711,8 @@ class TesterDialog(QDialog):
         row = self.device_list_widget.row(current)
         if 0 <= row < len(self.devices):
             device_info = self.devices[row]
-            device_id = str(device_info['index'])
             # 检查设备在配置文件中是否被标记为禁用
-            is_disabled = self.plugin.device_config.get(device_id, {}).get("disabled", False)
+            is_disabled = device_info['_disabled']
             
             # 录制按钮的启用状态取决于是否禁用和是否正在录制
             self.record_btn.setEnabled(not is_disabled)
@@ -662,12 +738,12 @@ class TesterDialog(QDialog):
             return # 目前只支持Windows
 
         try:
-            # 使用 os.system() 将整个命令作为一个字符串传递给系统命令解释器。
-            # 'start' 命令会直接打开声音设置的“录制”标签页
-            command = 'start control.exe mmsys.cpl,,1' 
-            os.system(command)
+            # 直接以非阻塞方式启动 control.exe，打开声音设置的“录制”标签页。
+            # 不经过 cmd.exe，既不会阻塞UI线程，也不会闪出控制台窗口。
+            subprocess.Popen(['control.exe', 'mmsys.cpl,,1'],
+                             creationflags=subprocess.CREATE_NO_WINDOW)
             
-        except Exception as e:
+        except OSError as e:
             QMessageBox.warning(self, "操作失败", f"无法打开系统声音设置:\n{e}")
 
     def start_all_tests(self):
@@ -677,16 +753,17 @@ class TesterDialog(QDialog):
         self.stop_all_tests() # 确保之前的所有测试已停止
         
         # 清除所有设备的状态图标和样式，准备重新测试
-        for dev_id, info in self.device_widgets.items():
-            info['label'].setStyleSheet("") # 清除变灰样式
-            info['status_icon'].clear() # 清除图标
+        for dev_id in self.device_widgets:
             # 确保将 config 中的 status 重置为 "untested"
-            self.plugin.device_config.setdefault(str(dev_id), {})['status'] = "untested"
-            # 刷新列表项的 Tooltip，因为 update_status_icon 在没有 status 时会设为“未测试”
-            self.update_status_icon(dev_id, "untested") 
+            config = self.plugin.device_config.setdefault(str(dev_id), {})
+            config['status'] = "untested"
+            config.pop('error_msg', None)
+            # 只刷新图标和 Tooltip，配置在循环结束后统一保存一次
+            self._apply_status_visual(dev_id, "untested")
+        self._save_config_only()
 
         # 筛选出未被禁用的设备进行测试
-        devices_to_test = [dev for dev in self.devices if not self.plugin.device_config.get(str(dev['index']), {}).get("disabled", False)]
+        devices_to_test = [dev for dev in self.devices if not dev['_disabled']]
         
         if not devices_to_test:
             QMessageBox.information(self, "无可用设备", "没有可供测试的已启用录音设备。\n请检查设备是否被禁用。")
@@ -695,6 +772,7 @@ class TesterDialog(QDialog):
         # 创建并启动 TestWorker 线程
         worker = TestWorker(devices_to_test, duration=5) # 传入 duration=5 参数
         self.active_test_workers['all'] = worker # 存储工作线程引用
+        self._register_volume_rings(worker.rings)
         
         worker.volume_update.connect(self.process_volume_data) 
         worker.device_error.connect(self.mark_device_as_error) 
@@ -740,40 +818,40 @@ class TesterDialog(QDialog):
         # 停止音量计UI更新定时器
         self.volume_update_timer.stop()
 
-    def process_volume_data(self, device_id, data_chunk):
+    def _register_volume_rings(self, rings):
+        """登记工作线程的环形缓冲区，并重置对应设备的读写指针。"""
+        for device_id, ring in rings.items():
+            self.volume_rings[device_id] = ring
+            self.volume_write_idx.pop(device_id, None)
+            self.volume_read_idx.pop(device_id, None)
+
+    def process_volume_data(self, device_id, write_idx):
         """
-        接收来自后台线程的原始音频数据，并将其放入对应设备的队列中。
+        接收来自后台线程的环形缓冲区写指针。
+        样本本身留在预分配的环形缓冲区中，由 update_all_volume_meters 按需读取。
         """
-        if device_id not in self.volume_meter_queues:
-            self.volume_meter_queues[device_id] = queue.Queue(maxsize=5) # 队列大小5
-        
-        try:
-            # 使用非阻塞方式放入，如果队列已满则丢弃旧数据（保证实时性）
-            if self.volume_meter_queues[device_id].full():
-                self.volume_meter_queues[device_id].get_nowait() # 丢弃最旧的
-            self.volume_meter_queues[device_id].put_nowait(data_chunk)
-        except queue.Full:
-            pass # 队列满时不做额外处理
+        self.volume_write_idx[device_id] = write_idx
 
     def update_all_volume_meters(self):
         """
         由QTimer触发，遍历所有设备，计算并平滑更新它们的音量条。
         """
         for device_id, widgets in self.device_widgets.items():
-            q = self.volume_meter_queues.get(device_id)
+            write_idx = self.volume_write_idx.get(device_id)
             history = self.volume_histories.setdefault(device_id, deque(maxlen=5)) # 历史记录 deque 大小5
             
             raw_target_value = 0
-            if q and not q.empty():
+            # 只有在上次读取后有新数据写入时才计算音量，否则视为音量为0
+            if write_idx is not None and write_idx != self.volume_read_idx.get(device_id):
+                self.volume_read_idx[device_id] = write_idx
                 try:
-                    data_chunk = q.get_nowait()
-                    if data_chunk is not None and data_chunk.any(): # 确保数据块不为空
+                    data_chunk = self.volume_rings[device_id].latest(write_idx)
+                    if data_chunk.any(): # 确保数据块不为空
                         rms = np.linalg.norm(data_chunk) / np.sqrt(len(data_chunk)) # 计算RMS
                         dbfs = 20 * np.log10(rms + 1e-9) # 转换为dBFS，加小量避免log(0)
                         # 将 -60dBFS 到 0dBFS 的范围映射到 0-100 的进度条值
-                        raw_target_value = max(0, min(100, (dbfs + 60) * (100 / 60)))
-                except queue.Empty:
-                    raw_target_value = 0 # 队列空，音量为0
+                        v = (dbfs + 60.0) * _DB_SCALE
+                        raw_target_value = 0.0 if v < 0.0 else (100.0 if v > 100.0 else v)
                 except Exception as e:
                     print(f"Error calculating volume for device {device_id}: {e}")
                     raw_target_value = 0
@@ -828,6 +906,7 @@ class TesterDialog(QDialog):
         self.test_all_btn.setEnabled(False) # 录制时禁用全局测试
         
         self.recording_worker = RecordingWorker(device_info, self.sample_filepath)
+        self._register_volume_rings(self.recording_worker.rings)
         self.recording_worker.recording_finished.connect(self.on_sample_recorded) # 连接录制完成信号
         self.recording_worker.volume_update.connect(self.process_volume_data) 
         
@@ -850,9 +929,7 @@ class TesterDialog(QDialog):
         current_item = self.device_list_widget.currentItem()
         if current_item:
             row = self.device_list_widget.row(current_item)
-            device_id_str = str(self.devices[row]['index'])
-            is_disabled = self.plugin.device_config.get(device_id_str, {}).get("disabled", False)
-            self.record_btn.setEnabled(not is_disabled)
+            self.record_btn.setEnabled(not self.devices[row]['_disabled'])
         else:
             self.record_btn.setEnabled(False)
         
@@ -993,9 +1070,9 @@ class TesterDialog(QDialog):
         
         row = self.device_list_widget.row(item)
         device_info = self.devices[row]
-        device_id = str(device_info['index'])
+        device_id = device_info['_id_str']
         # 检查设备当前是否在插件配置中被禁用
-        is_disabled = self.plugin.device_config.get(device_id, {}).get("disabled", False)
+        is_disabled = device_info['_disabled']
         
         menu = QMenu(); menu.setStyleSheet(self.main_window.styleSheet()) # 应用主窗口的QSS样式
         
@@ -1029,11 +1106,12 @@ class TesterDialog(QDialog):
         """
         开始对单个设备的实时监听测试。
         """
-        device_id_str = str(device_info['index'])
+        device_id_str = device_info['_id_str']
         self.stop_single_test(device_id_str) # 确保之前的已停止
         
         worker = TestWorker([device_info]) # 不传入 duration 参数，使其无限期运行
         self.active_test_workers[device_id_str] = worker
+        self._register_volume_rings(worker.rings)
         
         worker.volume_update.connect(self.process_volume_data) 
         worker.device_error.connect(self.mark_device_as_error)
@@ -1077,6 +1155,11 @@ class TesterDialog(QDialog):
         """
         config = self.plugin.device_config.setdefault(device_id, {})
         config["disabled"] = disable # 设置禁用状态
+        # 同步更新 self.devices 中缓存的禁用标记
+        for dev in self.devices:
+            if dev['_id_str'] == device_id:
+                dev['_disabled'] = disable
+                break
         self._save_and_refresh() # 保存配置并刷新UI
 
     def _save_and_refresh(self, refresh_ui=True):
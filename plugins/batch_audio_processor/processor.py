@@ -1,18 +1,22 @@
 # --- START OF FILE plugins/batch_processor/processor.py (v2.4 Final Polish) ---
 
 import os
+import re
 import sys
+import math
+import time
 import shutil
 import tempfile
 import traceback
 import threading
-from functools import partial
+from functools import partial, lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
                              QApplication, QMessageBox, QGroupBox, QTableWidget, QProgressBar,
                              QFileDialog, QCheckBox, QComboBox, QRadioButton, QTableWidgetItem,
                              QSplitter, QWidget, QHeaderView, QMenu, QLineEdit, QSlider, QFormLayout)
-from PyQt5.QtCore import Qt, QObject, QThread, pyqtSignal, QEvent, pyqtProperty
+from PyQt5.QtCore import Qt, QObject, QThread, QThreadPool, QRunnable, QTimer, pyqtSignal, QEvent, pyqtProperty
 from PyQt5.QtGui import QIcon, QPainter, QPen, QColor, QPalette
 
 try:
@@ -23,12 +27,525 @@ try:
 except ImportError:
     AUDIO_LIBS_AVAILABLE = False
 
+# 可选的高质量重采样后端：优先 soxr，其次 scipy 的多相重采样
+try:
+    import soxr
+    SOXR_AVAILABLE = True
+except ImportError:
+    SOXR_AVAILABLE = False
+
+try:
+    from scipy.signal import resample_poly, firwin
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# 可选的单遍平方和归约
+try:
+    import bottleneck as bn
+    BOTTLENECK_AVAILABLE = True
+except ImportError:
+    BOTTLENECK_AVAILABLE = False
+
+# 可选的 SIMD RMS 内核
+try:
+    import numpy_rms
+    NUMPY_RMS_AVAILABLE = True
+except ImportError:
+    NUMPY_RMS_AVAILABLE = False
+
+# 可选的 JIT 加速：用于融合的音量标准化内核
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 try:
     from plugin_system import BasePlugin
 except ImportError:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'modules')))
     from plugin_system import BasePlugin
 
+# ==============================================================================
+# 共享 DSP 工具函数
+# ==============================================================================
+def sum_of_squares(x):
+    """返回一维数组的平方和，不生成 x**2 的临时数组（优先 bottleneck.ss，否则使用 BLAS 点积）。"""
+    if BOTTLENECK_AVAILABLE: return float(bn.ss(x))
+    return float(np.dot(x, x))
+
+def signal_rms(x):
+    """返回一维数组的 RMS。numpy_rms 可用且为 float32 时使用其单遍 SIMD 内核，否则基于 sum_of_squares 计算。"""
+    if x.size == 0: return 0.0
+    if NUMPY_RMS_AVAILABLE and x.dtype == np.float32: return float(numpy_rms.rms(x, window_size=x.size)[0])
+    return math.sqrt(sum_of_squares(x) / x.size)
+
+def downmix_to_mono(data):
+    """
+    将 (N, C) 多声道音频混合为 float32 单声道。numba 可用时求和与缩放在一次遍历中完成；
+    否则立体声直接写入预分配的输出，避免 np.mean 的中间缓冲。
+    """
+    if NUMBA_AVAILABLE:
+        mono = np.empty(data.shape[0], dtype=np.float32)
+        _downmix_kernel(np.ascontiguousarray(data, dtype=np.float32), mono)
+        return mono
+    if data.shape[1] == 2:
+        mono = np.empty(data.shape[0], dtype=np.float32)
+        np.add(data[:, 0], data[:, 1], out=mono)
+        mono *= np.float32(0.5)
+        return mono
+    return data.mean(axis=1, dtype=np.float32)
+
+@lru_cache(maxsize=4)
+def _interp_source_grid(n):
+    """np.interp 回退路径使用的源采样点坐标，按长度缓存（只读），同长度文件之间复用。"""
+    grid = np.arange(n, dtype=np.float64); grid.setflags(write=False)
+    return grid
+
+@lru_cache(maxsize=8)
+def _poly_filter(up, down):
+    """
+    resample_poly 默认的 Kaiser 窗低通 FIR（与 scipy 内部设计一致），按 (up, down) 缓存。
+    以 float32 存储，配合 float32 输入使 upfirdn 全程保持单精度，且批量处理时无需逐文件重新设计滤波器。
+    """
+    max_rate = max(up, down)
+    h = firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=('kaiser', 5.0)).astype(np.float32)
+    h.setflags(write=False)
+    return h
+
+def resample_audio(data, sr, target_sr):
+    """
+    将音频从 sr 重采样到 target_sr，支持 (N,) 和 (N, C) 两种形状。
+    优先使用 soxr 的带限重采样，其次使用 scipy 的多相 FIR 重采样；
+    两者都不可用时才回退到 np.interp 线性插值（无抗混叠滤波）。
+    """
+    if sr == target_sr or len(data) == 0: return data
+    if SOXR_AVAILABLE:
+        return soxr.resample(data, sr, target_sr, quality='HQ')
+    if SCIPY_AVAILABLE:
+        g = math.gcd(int(sr), int(target_sr)); up, down = int(target_sr) // g, int(sr) // g
+        # resample_poly 会复制传入的滤波器系数再乘以 up，缓存的只读数组不会被修改
+        return resample_poly(data, up, down, axis=0, window=_poly_filter(up, down)).astype(data.dtype, copy=False)
+    num_samples = int(len(data) * target_sr / sr)
+    # np.interp 内部总以 float64 计算，因此坐标保持 float64 以免每次调用再做一次类型转换
+    x_new = np.linspace(0.0, len(data) - 1, num_samples); x_old = _interp_source_grid(len(data))
+    if data.ndim == 1: return np.interp(x_new, x_old, data).astype(data.dtype, copy=False)
+    return np.stack([np.interp(x_new, x_old, data[:, c]) for c in range(data.shape[1])], axis=1).astype(data.dtype, copy=False)
+
+# 批处理并发线程数：numpy / soundfile / soxr 在 C 层释放 GIL，多线程即可利用多核；
+# 留出一个核心给界面线程，但至少保留两个线程以便解码 I/O 与计算相互重叠
+BATCH_MAX_WORKERS = max(2, (os.cpu_count() or 1) - 1)
+
+# “一键标准化”固定的处理选项
+QUICK_NORMALIZE_OPTIONS = {
+    'convert_channels_enabled': True,
+    'resample_enabled': True, 'target_sr': 44100,
+    'normalize_enabled': True
+}
+
+# 超过此帧数的文件改用分块流式处理，峰值内存与文件长度无关
+STREAM_BLOCK_FRAMES = 1 << 16
+STREAM_THRESHOLD_FRAMES = 1 << 22 # 约 95 秒 @ 44.1kHz
+# 不超过此帧数的 16 位短片段在上采样时由融合内核一次完成插值与标准化（约 6 秒 @ 44.1kHz）
+SMALL_FILE_FRAMES = 1 << 18
+
+def stream_normalize_file(fin, out_path, options):
+    """
+    从已打开的 SoundFile 以分块方式处理大文件，并写出 PCM_16 WAV 到 out_path：
+    第一遍累积平方和计算 RMS，第二遍逐块混音、重采样、施加增益并写出。
+    注意：流式路径在重采样前计算 RMS，与整文件路径存在极小的差异。
+    """
+    sr = fin.samplerate; channels = fin.channels
+    to_mono = options['convert_channels_enabled'] and channels > 1
+    out_channels = 1 if to_mono else channels
+    block = np.empty((STREAM_BLOCK_FRAMES, channels), dtype=np.float32) # 预分配的读取缓冲，逐块复用
+
+    gain = None
+    if options['normalize_enabled']:
+        sum_sq = 0.0; count = 0
+        while True:
+            chunk = fin.read(out=block)
+            if len(chunk) == 0: break
+            x = downmix_to_mono(chunk) if to_mono else chunk.ravel()
+            sum_sq += sum_of_squares(x); count += x.size
+        current_rms = math.sqrt(sum_sq / count) if count else 0.0
+        if current_rms > 1e-9: gain = np.float32(0.1 / current_rms)
+        fin.seek(0)
+
+    target_sr = options['target_sr'] if options['resample_enabled'] else sr
+    resampler = soxr.ResampleStream(sr, target_sr, out_channels, dtype='float32', quality='HQ') if target_sr != sr else None
+    with sf.SoundFile(out_path, 'w', samplerate=target_sr, channels=out_channels, format='WAV', subtype='PCM_16') as fout:
+        while True:
+            chunk = fin.read(out=block)
+            is_last = len(chunk) < STREAM_BLOCK_FRAMES
+            x = downmix_to_mono(chunk) if to_mono else chunk
+            if resampler is not None: x = resampler.resample_chunk(x, last=is_last)
+            if gain is not None: apply_gain_limit(x, gain)
+            if len(x): fout.write(x)
+            if is_last: break
+
+class Float32BufferPool:
+    """
+    线程安全的 float32 缓冲池：按 2 的幂长度分桶，批量处理时在文件之间复用解码缓冲，
+    避免反复分配大块内存（以及随之而来的缺页开销）。每个桶最多保留 max_per_bucket 个缓冲。
+    """
+    def __init__(self, max_per_bucket=2):
+        self._buckets = {}; self._lock = threading.Lock(); self.max_per_bucket = max_per_bucket
+
+    def acquire(self, shape):
+        n = math.prod(shape); size = 1 << max(0, (n - 1).bit_length())
+        with self._lock:
+            bucket = self._buckets.get(size)
+            buf = bucket.pop() if bucket else None
+        if buf is None: buf = np.empty(size, dtype=np.float32)
+        return buf[:n].reshape(shape)
+
+    def release(self, view):
+        """归还 acquire 得到的数组（或其任意视图）；调用方之后不得再使用它。"""
+        buf = view
+        while buf.base is not None and isinstance(buf.base, np.ndarray): buf = buf.base
+        with self._lock:
+            bucket = self._buckets.setdefault(buf.size, [])
+            if len(bucket) < self.max_per_bucket: bucket.append(buf)
+
+def create_backup(path, backup_path):
+    """
+    为 path 创建备份。优先使用硬链接（仅修改文件系统元数据，无需复制文件内容）；
+    跨卷、文件系统不支持硬链接等情况下回退到 shutil.copy2。
+    硬链接备份之所以安全，是因为标准化结果总是先写入临时文件再 os.replace 到目标路径，
+    不会原地改写原文件的数据。
+    """
+    try:
+        if os.path.lexists(backup_path): os.remove(backup_path) # 与 copy2 一样覆盖旧备份
+        os.link(path, backup_path)
+    except OSError:
+        shutil.copy2(path, backup_path)
+
+def read_into_buffer(fin, frames=None, pool=None):
+    """
+    按文件头中的帧数一次性分配 C 连续的 float32 缓冲，并将已打开的 SoundFile 从当前位置解码进去。
+    frames 为 None 时读取整个文件，否则只读取 frames 帧；给出 pool 时从缓冲池取得缓冲。
+    """
+    if frames is None: frames = fin.frames
+    shape = (frames, fin.channels) if fin.channels > 1 else (frames,)
+    return fin.read(out=pool.acquire(shape) if pool is not None else np.empty(shape, dtype=np.float32))
+
+def remove_replaced_source(filepath, target_filepath):
+    """
+    结果已原子替换到 target_filepath 后，若源文件是另一个文件（格式转换，或仅扩展名大小写不同的 .WAV）则删除之。
+    以 samefile 判断而非比较扩展名：大小写不敏感的文件系统上 a.WAV 与 a.wav 是同一个文件，不能删除。
+    """
+    if filepath != target_filepath and os.path.exists(filepath) and not os.path.samefile(filepath, target_filepath):
+        os.remove(filepath)
+
+def quick_normalize_target(filepath):
+    """“一键标准化”的目标路径：同名、强制使用 .wav 扩展名。"""
+    return os.path.splitext(filepath)[0] + ".wav"
+
+def create_unique_tmp(target_filepath):
+    """
+    在目标文件所在目录创建一个唯一的空临时文件并返回其路径。
+    与 tempfile.mkstemp (0600) 不同，以 0o666 创建并受 umask 约束，原子替换后目标文件保持普通新建文件的权限。
+    """
+    while True:
+        tmp_path = f"{target_filepath}.{os.urandom(4).hex()}.tmp"
+        try: os.close(os.open(tmp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)); return tmp_path
+        except FileExistsError: continue
+
+def quick_normalize_file(filepath, options=QUICK_NORMALIZE_OPTIONS, parallel_dsp=False, pool=None):
+    """对单个文件执行“一键标准化”，结果以 WAV 覆盖写回；返回写入的目标路径。给出 pool 时解码缓冲从中取得并在写出后归还。"""
+    # 1-2. 创建新的目标文件路径，强制使用 .wav 扩展名
+    target_filepath = quick_normalize_target(filepath)
+    # 每次调用使用唯一的临时文件：同时处理的其他任务（如 a.mp3 与 a.wav 指向同一目标，或并发的自动修复）不会写入同一个临时文件
+    tmp_path = create_unique_tmp(target_filepath)
+    try:
+        _normalize_into(filepath, target_filepath, tmp_path, options, parallel_dsp, pool)
+    except BaseException:
+        # 出错时清理临时文件，目标文件保持不变
+        try: os.remove(tmp_path)
+        except OSError: pass
+        raise
+    # 4. 如果源文件不是目标文件 (意味着发生了格式转换)，则在替换成功后删除源文件
+    remove_replaced_source(filepath, target_filepath)
+    return target_filepath
+
+def _normalize_into(filepath, target_filepath, tmp_path, options, parallel_dsp, pool):
+    """quick_normalize_file 的处理主体：结果写入 tmp_path 后原子替换到 target_filepath。"""
+    # 只打开一次源文件：文件头中的帧数既用于选择处理路径，也用于预先确定解码缓冲的大小
+    with sf.SoundFile(filepath) as fin:
+        sr = fin.samplerate
+        needs_resample = options['resample_enabled'] and sr != options['target_sr']
+        # 大文件走流式路径（需要重采样时要求 soxr 的流式重采样器可用）
+        streaming = fin.frames > STREAM_THRESHOLD_FRAMES and (SOXR_AVAILABLE or not needs_resample)
+        # 16 位 PCM 源、无需重采样时全程使用整数样本：解码数据量减半，且省去 float 与 int16 之间的两次转换
+        # 短片段上采样时（无需抗混叠滤波）由 numba 融合内核在整数路径中一并完成 Hermite 插值
+        int_resample = (needs_resample and NUMBA_AVAILABLE and sr < options['target_sr'] and fin.frames <= SMALL_FILE_FRAMES)
+        int_path = (not streaming and fin.subtype == 'PCM_16' and (not needs_resample or int_resample) and options['normalize_enabled']
+                    and (fin.channels == 1 or options['convert_channels_enabled']))
+        if streaming:
+            stream_normalize_file(fin, tmp_path, options)
+        elif int_path:
+            pcm = fin.read(out=np.empty((fin.frames, fin.channels) if fin.channels > 1 else (fin.frames,), dtype=np.int16))
+        else:
+            # 读取源文件 (float32 足以覆盖 ±1.0 的音频范围，且内存带宽减半；C 连续，便于 SIMD)
+            data = decoded = read_into_buffer(fin, pool=pool)
+    if int_path:
+        if needs_resample: pcm, sr = resample_normalize_pcm16(pcm, sr, options['target_sr']), options['target_sr']
+        else: pcm = normalize_pcm16(pcm)
+        sf.write(tmp_path, pcm, sr, format='WAV', subtype='PCM_16')
+    if streaming or int_path:
+        # 结果先写入临时文件再原子替换，因为目标路径可能就是源文件本身
+        os.replace(tmp_path, target_filepath)
+        return
+    
+    # 无论处理或写出是否成功，解码缓冲都归还到池中，出错的文件不会让缓冲池逐渐耗尽
+    try:
+        # --- 标准化处理 (已移除静音裁切) ---
+        is_multichannel = data.ndim > 1 and data.shape[1] > 1
+        if options['convert_channels_enabled'] and is_multichannel and options['normalize_enabled'] and not needs_resample:
+            # 无需重采样时，混音与标准化融合为一次遍历
+            data = downmix_and_normalize(data)
+        else:
+            if options['convert_channels_enabled'] and is_multichannel:
+                data = downmix_to_mono(data)
+            if needs_resample:
+                data = resample_audio(data, sr, options['target_sr'])
+                sr = options['target_sr']
+            if options['normalize_enabled']:
+                data = rms_normalize(data, parallel=parallel_dsp)
+    
+        # 3. 将处理后的数据写入新的 .wav 文件（先写临时文件再原子替换，并行处理或中途出错时不会留下写了一半的目标文件）
+        # 标准化的输出已裁剪到 [-1, 1]，量化时无需再裁剪
+        sf.write(tmp_path, to_pcm16(data, clipped=options['normalize_enabled']), sr, format='WAV', subtype='PCM_16')
+        os.replace(tmp_path, target_filepath)
+    finally:
+        if pool is not None: pool.release(decoded)
+
+if NUMBA_AVAILABLE:
+    # nogil=True 使多个批处理线程可以真正并行地执行此内核
+    @njit(nogil=True, fastmath=True, cache=True)
+    def _rms_normalize_kernel(x, target_rms):
+        n = x.size
+        if n == 0: return
+        sum_sq = 0.0
+        for i in range(n): sum_sq += x[i] * x[i]
+        rms = math.sqrt(sum_sq / n)
+        if rms <= 1e-9: return
+        gain = target_rms / rms
+        for i in range(n):
+            v = x[i] * gain
+            x[i] = -1.0 if v < -1.0 else (1.0 if v > 1.0 else v)
+
+    # 文件内并行版本：按样本轴将两遍循环分摊到多个核心。
+    # numba 默认线程层不支持多个线程同时启动并行内核，因此只在批次中仅有一个文件时使用。
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _rms_normalize_kernel_parallel(x, target_rms):
+        n = x.size
+        if n == 0: return
+        sum_sq = 0.0
+        for i in prange(n): sum_sq += x[i] * x[i]
+        rms = math.sqrt(sum_sq / n)
+        if rms <= 1e-9: return
+        gain = target_rms / rms
+        for i in prange(n):
+            v = x[i] * gain
+            x[i] = -1.0 if v < -1.0 else (1.0 if v > 1.0 else v)
+
+    @njit(nogil=True, fastmath=True, cache=True)
+    def _downmix_normalize_kernel(x, target_rms, out):
+        n, channels = x.shape
+        inv = 1.0 / channels
+        sum_sq = 0.0
+        for i in range(n):
+            m = 0.0
+            for c in range(channels): m += x[i, c]
+            m *= inv
+            sum_sq += m * m
+        rms = math.sqrt(sum_sq / n) if n > 0 else 0.0
+        gain = target_rms / rms if rms > 1e-9 else 1.0
+        for i in range(n):
+            m = 0.0
+            for c in range(channels): m += x[i, c]
+            v = m * inv * gain
+            out[i] = -1.0 if v < -1.0 else (1.0 if v > 1.0 else v)
+
+    @njit(nogil=True, fastmath=True, cache=True)
+    def _pcm16_normalize_kernel(x, target_rms, out):
+        n, channels = x.shape
+        sum_sq = 0
+        for i in range(n):
+            m = 0
+            for c in range(channels): m += np.int64(x[i, c])
+            sum_sq += m * m
+        rms = math.sqrt(sum_sq / n) / (channels * 32768.0) if n > 0 else 0.0
+        scale = (target_rms / rms if rms > 1e-9 else 1.0) * 32767.0 / (32768.0 * channels)
+        for i in range(n):
+            m = 0
+            for c in range(channels): m += np.int64(x[i, c])
+            v = m * scale
+            v = -32767.0 if v < -32767.0 else (32767.0 if v > 32767.0 else v)
+            out[i] = np.int16(np.rint(v)) # 与 numpy 回退路径及浮点路径的 np.rint 一致：四舍六入五成双
+
+    @njit(nogil=True, fastmath=True, cache=True)
+    def _hermite_mixed(x, pos):
+        # 在位置 pos 处对混音后的信号做 4 点 Hermite 插值，端点处复制边界样本
+        n, channels = x.shape
+        i = int(pos); t = pos - i
+        j0 = max(i - 1, 0); j1 = min(i, n - 1); j2 = min(i + 1, n - 1); j3 = min(i + 2, n - 1)
+        y0 = 0.0; y1 = 0.0; y2 = 0.0; y3 = 0.0
+        for c in range(channels):
+            y0 += x[j0, c]; y1 += x[j1, c]; y2 += x[j2, c]; y3 += x[j3, c]
+        c1 = 0.5 * (y2 - y0)
+        c2 = y0 - 2.5 * y1 + 2.0 * y2 - 0.5 * y3
+        c3 = 0.5 * (y3 - y0) + 1.5 * (y1 - y2)
+        return ((c3 * t + c2) * t + c1) * t + y1
+
+    @njit(nogil=True, fastmath=True, cache=True)
+    def _pcm16_resample_normalize_kernel(x, step, target_rms, out):
+        # 第一遍只累积插值结果的平方和，第二遍重新插值并带增益写出，无需中间缓冲
+        n_out = out.size; channels = x.shape[1]
+        if n_out == 0: return
+        sum_sq = 0.0
+        for i in range(n_out):
+            v = _hermite_mixed(x, i * step); sum_sq += v * v
+        rms = math.sqrt(sum_sq / n_out) / (channels * 32768.0)
+        scale = (target_rms / rms if rms > 1e-9 else 1.0) * 32767.0 / (32768.0 * channels)
+        for i in range(n_out):
+            v = _hermite_mixed(x, i * step) * scale
+            v = -32767.0 if v < -32767.0 else (32767.0 if v > 32767.0 else v)
+            out[i] = np.int16(np.rint(v)) # 与 numpy 回退路径及浮点路径的 np.rint 一致：四舍六入五成双
+
+    @njit(nogil=True, fastmath=True, cache=True)
+    def _gain_limit_kernel(x, gain):
+        for i in range(x.size):
+            v = x[i] * gain
+            x[i] = -1.0 if v < -1.0 else (1.0 if v > 1.0 else v)
+
+    @njit(nogil=True, fastmath=True, cache=True)
+    def _downmix_kernel(x, out):
+        n, channels = x.shape
+        inv = 1.0 / channels
+        for i in range(n):
+            m = 0.0
+            for c in range(channels): m += x[i, c]
+            out[i] = m * inv
+
+    # 静音检测：首尾各扫描一次，遇到第一个超过阈值的帧即停止，不生成任何中间数组
+    @njit(nogil=True, fastmath=True, cache=True)
+    def _find_sound_bounds_kernel(x, thr):
+        n, channels = x.shape
+        first = -1
+        for i in range(n):
+            for c in range(channels):
+                if abs(x[i, c]) > thr: first = i; break
+            if first >= 0: break
+        if first < 0: return -1, -1
+        for i in range(n - 1, first - 1, -1):
+            for c in range(channels):
+                if abs(x[i, c]) > thr: return first, i
+        return first, first
+
+# 使用文件内并行内核的最小样本数，过短的文件不值得线程调度开销
+PARALLEL_DSP_MIN_SAMPLES = 1 << 20
+
+def warmup_dsp_kernels(parallel=False):
+    """预先触发 JIT 编译（或加载缓存），避免第一个文件承担编译延迟。"""
+    if NUMBA_AVAILABLE:
+        _rms_normalize_kernel(np.zeros(16, dtype=np.float32), 0.1)
+        _downmix_normalize_kernel(np.zeros((16, 2), dtype=np.float32), 0.1, np.empty(16, dtype=np.float32))
+        _downmix_kernel(np.zeros((16, 2), dtype=np.float32), np.empty(16, dtype=np.float32))
+        _gain_limit_kernel(np.zeros(16, dtype=np.float32), np.float32(1.0))
+        _pcm16_normalize_kernel(np.zeros((16, 1), dtype=np.int16), 0.1, np.empty(16, dtype=np.int16))
+        _pcm16_resample_normalize_kernel(np.zeros((16, 1), dtype=np.int16), 0.5, 0.1, np.empty(32, dtype=np.int16))
+        _find_sound_bounds_kernel(np.zeros((16, 1), dtype=np.float32), 0.1)
+        if parallel: _rms_normalize_kernel_parallel(np.zeros(16, dtype=np.float32), 0.1)
+
+def downmix_and_normalize(data, target_rms=0.1):
+    """
+    将 (N, C) 多声道音频混合为单声道并进行 RMS 标准化。
+    numba 可用时在一个融合内核中完成（每个样本只读取两次、写入一次），否则依次调用两个 numpy 步骤。
+    """
+    if NUMBA_AVAILABLE:
+        out = np.empty(data.shape[0], dtype=np.float32)
+        _downmix_normalize_kernel(np.ascontiguousarray(data, dtype=np.float32), target_rms, out)
+        return out
+    return rms_normalize(downmix_to_mono(data), target_rms)
+
+def rms_normalize(data, target_rms=0.1, parallel=False):
+    """
+    将音频的 RMS 调整到 target_rms 并裁剪到 [-1, 1]。numba 可用时单次遍历、原地完成。
+    parallel=True 时（调用方保证没有其他线程同时处理文件），长文件改用文件内多核并行内核。
+    """
+    data = np.ascontiguousarray(data, dtype=np.float32)
+    if NUMBA_AVAILABLE:
+        if parallel and data.size >= PARALLEL_DSP_MIN_SAMPLES: _rms_normalize_kernel_parallel(data.reshape(-1), target_rms)
+        else: _rms_normalize_kernel(data.reshape(-1), target_rms)
+        return data
+    current_rms = signal_rms(data.reshape(-1))
+    if current_rms > 1e-9:
+        gain = np.float32(target_rms / current_rms)
+        apply_gain_limit(data, gain)
+    return data
+
+def apply_gain_limit(x, gain):
+    """
+    原地施加增益并硬限幅到 [-1, 1]，不分配任何输出缓冲。x 须为 C 连续的 float32。
+    numba 可用时增益与限幅在一次遍历中完成，否则依次调用两个带 out= 的 ufunc。
+    """
+    if NUMBA_AVAILABLE: _gain_limit_kernel(x.reshape(-1), np.float32(gain)); return x
+    np.multiply(x, np.float32(gain), out=x); np.clip(x, np.float32(-1.0), np.float32(1.0), out=x)
+    return x
+
+# 整数标准化路径分块处理的帧数，限制 int64 中间缓冲的大小
+PCM16_BLOCK_FRAMES = 1 << 16
+
+def normalize_pcm16(pcm, target_rms=0.1):
+    """
+    对 int16 样本 ((N,) 或 (N, C)) 执行混音为单声道 + RMS 标准化，直接输出 int16。
+    结果与“解码为 float → downmix_and_normalize → to_pcm16”一致（误差不超过 1 LSB）：
+    平方和以 int64 精确累积，增益与 float→int16 的缩放合并为一个系数，限幅到 ±32767。
+    numba 可用时两遍循环在一个内核中完成，否则按块使用 int64 中间缓冲。
+    """
+    pcm = pcm.reshape(len(pcm), -1); n, channels = pcm.shape
+    out = np.empty(n, dtype=np.int16)
+    if NUMBA_AVAILABLE: _pcm16_normalize_kernel(np.ascontiguousarray(pcm), target_rms, out); return out
+    def mixed(start):
+        return pcm[start:start + PCM16_BLOCK_FRAMES].sum(axis=1, dtype=np.int64)
+    sum_sq = 0
+    for start in range(0, n, PCM16_BLOCK_FRAMES):
+        m = mixed(start); sum_sq += int(np.dot(m, m))
+    rms = math.sqrt(sum_sq / n) / (channels * 32768.0) if n else 0.0
+    scale = (target_rms / rms if rms > 1e-9 else 1.0) * 32767.0 / (32768.0 * channels)
+    for start in range(0, n, PCM16_BLOCK_FRAMES):
+        v = mixed(start) * scale; np.rint(v, out=v); np.clip(v, -32767.0, 32767.0, out=v)
+        out[start:start + len(v)] = v
+    return out
+
+def resample_normalize_pcm16(pcm, sr, target_sr, target_rms=0.1):
+    """
+    int16 短片段的混音 + 上采样 + RMS 标准化，在一个 numba 内核中完成并直接输出 int16（调用方保证 NUMBA_AVAILABLE）。
+    插值使用 4 点 Hermite (Catmull-Rom)；上采样不需要抗混叠滤波，因此只用于 sr < target_sr 的情形。
+    """
+    pcm = np.ascontiguousarray(pcm.reshape(len(pcm), -1))
+    out = np.empty(int(len(pcm) * target_sr / sr), dtype=np.int16)
+    _pcm16_resample_normalize_kernel(pcm, sr / target_sr, target_rms, out)
+    return out
+
+def to_pcm16(data, clipped=False):
+    """
+    将 [-1, 1] 范围的音频量化为 int16（缩放与 libsndfile 的 float→PCM_16 一致），
+    使转换走 numpy 的向量化路径。注意：会原地改写传入的 float32 缓冲区。
+    clipped=True 表示数据已被标准化步骤裁剪到 [-1, 1]，此时省去多余的一遍裁剪。
+    """
+    data = np.ascontiguousarray(data, dtype=np.float32)
+    np.multiply(data, np.float32(32767.0), out=data); np.rint(data, out=data)
+    if not clipped: np.clip(data, np.float32(-32768.0), np.float32(32767.0), out=data)
+    return data.astype(np.int16)
+
+# 进度信号的最小发送间隔（约 30 Hz），更频繁的更新肉眼无法分辨
+PROGRESS_EMIT_INTERVAL = 1.0 / 30
+
 class QuickNormalizeWorker(QObject):
     progress = pyqtSignal(int, str)
     finished_with_refresh_request = pyqtSignal()
@@ -39,73 +556,106 @@ class QuickNormalizeWorker(QObject):
         self.filepaths = filepaths
         self.parent_window = parent_window
         self._is_running = True
+        self._pool = Float32BufferPool()
 
     def stop(self):
         self._is_running = False
 
-    def run(self):
-        # 固定的处理选项 (保持不变)
-        TARGET_SR = 44100
-        OPTIONS = {
-            'convert_channels_enabled': True,
-            'resample_enabled': True, 'target_sr': TARGET_SR,
-            'normalize_enabled': True
-        }
+    def _normalize_group(self, paths):
+        """按原选择顺序依次处理写入同一目标文件的一组源文件（如 a.mp3 与 a.wav）。"""
+        for filepath in paths:
+            # 已取消时，尚未开始的任务直接跳过
+            if not self._is_running: return
+            try:
+                # 只有一个文件时没有文件级并发，改为在文件内部并行
+                quick_normalize_file(filepath, parallel_dsp=len(self.filepaths) == 1, pool=self._pool)
+            except Exception as e:
+                print(f"处理文件 '{os.path.basename(filepath)}' 时出错: {e}", file=sys.stderr)
 
-        total_files = len(self.filepaths)
-        for i, filepath in enumerate(self.filepaths):
-            if not self._is_running:
-                break
-            
-            filename = os.path.basename(filepath)
-            self.progress.emit(int((i / total_files) * 100), f"处理中 ({i+1}/{total_files}): {filename}")
+    def _target_groups(self):
+        """
+        按目标路径分组：同一目标的源文件归为一个任务串行处理，不同任务之间不会同时读写同一个文件。
+        组按其中最大文件的大小从大到小排列，组内保持原选择顺序。
+        """
+        groups = {}
+        for i in largest_first(self.filepaths):
+            groups.setdefault(os.path.normcase(os.path.abspath(quick_normalize_target(self.filepaths[i]))), []).append(i)
+        return [[self.filepaths[i] for i in sorted(indices)] for indices in groups.values()]
 
-            try:
-                # =================== [核心修正开始] ===================
+    def run(self):
+        warmup_dsp_kernels(parallel=len(self.filepaths) == 1)
+        total_files = len(self.filepaths)
+        done = 0; last_pct = -1; last_emit = 0.0
+        with ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS) as executor:
+            futures = {executor.submit(self._normalize_group, paths): paths for paths in self._target_groups()}
+            for future in as_completed(futures):
+                paths = futures[future]; filename = os.path.basename(paths[-1])
+                done += len(paths)
+                try:
+                    future.result()
+                except Exception as e:
+                    error_msg = f"处理文件 '{filename}' 时出错: {e}"
+                    print(error_msg, file=sys.stderr)
+                    # self.error.emit(error_msg)
+                if not self._is_running:
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    break
+                pct = int((done / total_files) * 100); now = time.monotonic()
+                # 百分比未变化或距上次发送不足一帧时不发送信号，避免大批量小文件时的信号风暴；最后一个文件总是发送
+                if done == total_files or (pct != last_pct and now - last_emit >= PROGRESS_EMIT_INTERVAL):
+                    last_pct = pct; last_emit = now; self.progress.emit(pct, f"已处理 ({done}/{total_files}): {filename}")
 
-                # 1. 分离基本路径和旧扩展名
-                base_path, old_ext = os.path.splitext(filepath)
-                # 2. 创建新的目标文件路径，强制使用 .wav 扩展名
-                target_filepath = base_path + ".wav"
+        self.progress.emit(100, "处理完成！")
+        self.finished_with_refresh_request.emit()
 
-                # 读取源文件
-                data, sr = sf.read(filepath)
-                
-                # --- 标准化处理 (已移除静音裁切) ---
-                if OPTIONS['convert_channels_enabled']:
-                    if data.ndim > 1 and data.shape[1] > 1:
-                        data = np.mean(data, axis=1)
-                if OPTIONS['resample_enabled'] and sr != OPTIONS['target_sr']:
-                    num_samples = int(len(data) * OPTIONS['target_sr'] / sr)
-                    data = np.interp(np.linspace(0, len(data), num_samples), np.arange(len(data)), data)
-                    sr = OPTIONS['target_sr']
-                if OPTIONS['normalize_enabled']:
-                    current_rms = np.sqrt(np.mean(data**2))
-                    if current_rms > 1e-9:
-                        gain = 0.1 / current_rms
-                        data = np.clip(data * gain, -1.0, 1.0)
-                
-                # 3. 将处理后的数据写入新的 .wav 文件
-                sf.write(target_filepath, data, sr, format='WAV')
+class AutoFixSignals(QObject):
+    """自动修复任务的信号路由器：在主线程创建并长期存在，任务以 fix_id 区分各自的回调。"""
+    success = pyqtSignal(int, str)
+    failure = pyqtSignal(int, str)
 
-                # 4. 如果源文件不是 WAV (意味着发生了格式转换)，则在写入成功后删除源文件
-                if old_ext.lower() != ".wav" and os.path.exists(filepath):
-                    os.remove(filepath)
+class AutoFixRunnable(QRunnable):
+    """在共享线程池中修复一个无法播放的文件：先备份，再按“一键标准化”的参数转换并原子写回。"""
+    def __init__(self, fix_id, path_to_fix, signals):
+        super().__init__()
+        self.fix_id = fix_id
+        self.path_to_fix = path_to_fix
+        self.signals = signals
 
-                # =================== [核心修正结束] ===================
+    def run(self):
+        try:
+            # 1. 尝试创建备份
+            try:
+                backup_path = self.path_to_fix + ".bak"
+                create_backup(self.path_to_fix, backup_path)
+            except Exception as backup_e:
+                print(f"Warning: Could not create backup for {self.path_to_fix}: {backup_e}")
 
-            except Exception as e:
-                error_msg = f"处理文件 '{filename}' 时出错: {e}"
-                print(error_msg, file=sys.stderr)
-                # self.error.emit(error_msg)
-                continue
+            # 2-5. 转换与标准化处理与“一键标准化”完全相同（单声道、44.1kHz、RMS 标准化、PCM_16 WAV），
+            # 直接复用 quick_normalize_file：超大文件自动走分块流式路径，峰值内存与文件长度无关；
+            # 结果先写入临时文件再原子替换，仅在格式转换时删除原始文件。
+            target_filepath = quick_normalize_file(self.path_to_fix)
 
-        self.progress.emit(100, "处理完成！")
-        self.finished_with_refresh_request.emit()
+            # 6. 报告成功
+            self.signals.success.emit(self.fix_id, target_filepath)
+        except Exception as e:
+            self.signals.failure.emit(self.fix_id, str(e))
 
 # ==============================================================================
 # 0. 可样式化的波形预览控件 (从核心模块引入)
 # ==============================================================================
+# 后台线程随处理结果一起生成的波形包络点数，界面按控件宽度再次归约
+WAVEFORM_ENVELOPE_POINTS = 2048
+
+def peak_envelope(data, points):
+    """
+    将音频按等长分桶归约为每桶的绝对值峰值（多声道时包含所有声道），最多 points 个点。
+    以每桶的 max 与 -min 取较大者代替 np.abs，避免生成整段的绝对值数组。
+    """
+    n = len(data)
+    if n <= points: return np.abs(data) if data.ndim == 1 else np.abs(data).max(axis=1)
+    step = n // points; blocks = data[:(n // step) * step].reshape(n // step, -1)
+    return np.maximum(blocks.max(axis=1), -blocks.min(axis=1))
+
 class WaveformWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -152,19 +702,21 @@ class WaveformWidget(QWidget):
             self._is_selected = selected
             self.update()
 
+    def _target_points(self): return self.width() * 2 if self.width() > 0 else 400
+
+    def set_envelope(self, envelope):
+        """直接使用后台线程预先计算好的峰值包络，界面线程只需绘制。"""
+        self._waveform_data = None if envelope is None else peak_envelope(envelope, self._target_points())
+        self.update()
+
     def set_waveform_data(self, audio_filepath):
         self._waveform_data = None
         if not (audio_filepath and os.path.exists(audio_filepath)): self.update(); return
         try:
-            data, sr = sf.read(audio_filepath, dtype='float32')
-            if data.ndim > 1: data = data.mean(axis=1)
-            num_samples = len(data)
-            target_points = self.width() * 2 if self.width() > 0 else 400
-            if num_samples <= target_points: self._waveform_data = data
-            else:
-                step = num_samples // target_points
-                peak_data = [np.max(np.abs(data[i:i+step])) for i in range(0, num_samples, step)]
-                self._waveform_data = np.array(peak_data)
+            # 处理结果的临时文件为 .npy，以内存映射读取；其他情况按音频文件解码
+            if audio_filepath.endswith('.npy'): data = load_temp_audio(audio_filepath, mmap=True)
+            else: data, sr = sf.read(audio_filepath, dtype='float32')
+            self._waveform_data = peak_envelope(data, self._target_points())
         except Exception as e: self._waveform_data = None
         self.update()
 
@@ -185,14 +737,92 @@ class WaveformWidget(QWidget):
 # ==============================================================================
 # 1. 后台音频处理工作器 (无变动)
 # ==============================================================================
+# 静音检测按块扫描的帧数：首尾各自向内扫描，命中后只在该块内精确定位
+TRIM_SCAN_CHUNK = 1 << 14
+
+def _chunk_has_sound(chunk, threshold_amp):
+    """用 max / min 两次归约判断块内是否有样本超过阈值，不生成绝对值数组。"""
+    return chunk.max() > threshold_amp or chunk.min() < -threshold_amp
+
+def _frame_sound_mask(chunk, threshold_amp):
+    """返回每一帧是否超过阈值的布尔掩码（多声道时任一声道超过即可），以 ±阈值比较代替 np.abs。"""
+    mask = np.greater(chunk, threshold_amp); mask |= np.less(chunk, -threshold_amp)
+    return mask if mask.ndim == 1 else mask.any(axis=1)
+
+def find_sound_bounds(audio, threshold_amp):
+    """
+    返回首个与最后一个超过阈值的帧索引 (first, last)，全部静音时返回 None。
+    numba 可用时逐样本首尾扫描；否则从头、尾分块扫描并在命中后提前结束，
+    有声部分开始较早时只需读取文件首尾的少量数据。
+    """
+    # 0 帧的缓冲无法 reshape(0, -1)，视为全部静音，调用方会原样返回音频
+    if len(audio) == 0: return None
+    if NUMBA_AVAILABLE:
+        first, last = _find_sound_bounds_kernel(audio.reshape(len(audio), -1), threshold_amp)
+        return None if first < 0 else (first, last)
+    n = len(audio)
+    for start in range(0, n, TRIM_SCAN_CHUNK):
+        chunk = audio[start:start + TRIM_SCAN_CHUNK]
+        if _chunk_has_sound(chunk, threshold_amp): first = start + int(np.argmax(_frame_sound_mask(chunk, threshold_amp))); break
+    else: return None
+    for stop in range(n, first, -TRIM_SCAN_CHUNK):
+        chunk = audio[max(first, stop - TRIM_SCAN_CHUNK):stop]
+        if _chunk_has_sound(chunk, threshold_amp): return first, stop - 1 - int(np.argmax(_frame_sound_mask(chunk, threshold_amp)[::-1]))
+    return first, first
+
+def scan_sound_bounds(fin, threshold_amp):
+    """
+    在已打开的 SoundFile 上分块查找有声范围 (first, last)，全部静音时返回 None。
+    先从头向后读，命中后再从文件末尾向前按块 seek 读取，静音之间的有声内容不会被解码。
+    """
+    n = fin.frames; shape = (STREAM_BLOCK_FRAMES, fin.channels) if fin.channels > 1 else (STREAM_BLOCK_FRAMES,)
+    block = np.empty(shape, dtype=np.float32); pos = 0; first = None
+    fin.seek(0)
+    while pos < n:
+        chunk = fin.read(out=block)
+        if len(chunk) == 0: break
+        bounds = find_sound_bounds(chunk, threshold_amp)
+        if bounds is not None: first = pos + bounds[0]; break
+        pos += len(chunk)
+    if first is None: return None
+    stop = n
+    while stop > first:
+        lo = max(first, stop - STREAM_BLOCK_FRAMES); fin.seek(lo)
+        chunk = fin.read(out=block[:stop - lo])
+        bounds = find_sound_bounds(chunk, threshold_amp)
+        if bounds is not None: return first, lo + bounds[1]
+        stop = lo
+    return first, first
+
+def _padded_range(first_sound, last_sound, n, sr, padding_ms):
+    padding_samples = int(sr * padding_ms / 1000)
+    return max(0, first_sound - padding_samples), min(n, last_sound + padding_samples)
+
+def read_trimmed(fin, threshold_db, padding_ms, fade_out_ms):
+    """
+    大文件的裁切静音：先用 scan_sound_bounds 定位有声范围，再只解码裁切后的区间，
+    峰值内存与被裁掉的静音长度无关。结果与 read_into_buffer + trim_silence_numpy 一致。
+    """
+    sr = fin.samplerate; bounds = scan_sound_bounds(fin, 10**(threshold_db / 20))
+    fin.seek(0)
+    if bounds is None: return read_into_buffer(fin)
+    start_index, end_index = _padded_range(bounds[0], bounds[1], fin.frames, sr, padding_ms)
+    fin.seek(start_index)
+    return apply_fade_out(read_into_buffer(fin, end_index - start_index), sr, fade_out_ms)
+
 def trim_silence_numpy(audio, sr, threshold_db, padding_ms, fade_out_ms):
-    threshold_amp = 10**(threshold_db / 20); padding_samples = int(sr * padding_ms / 1000)
-    is_sound = np.abs(audio) > threshold_amp
-    if not np.any(is_sound): return audio
-    first_sound = np.argmax(is_sound); last_sound = len(audio) - 1 - np.argmax(is_sound[::-1])
-    start_index = max(0, first_sound - padding_samples); end_index = min(len(audio), last_sound + padding_samples)
-    trimmed_audio = audio[start_index:end_index]
-    
+    threshold_amp = 10**(threshold_db / 20)
+    bounds = find_sound_bounds(audio, threshold_amp)
+    if bounds is None: return audio
+    start_index, end_index = _padded_range(bounds[0], bounds[1], len(audio), sr, padding_ms)
+    return apply_fade_out(audio[start_index:end_index], sr, fade_out_ms)
+
+@lru_cache(maxsize=8)
+def _fade_curve(n, dtype_str):
+    curve = np.cos(np.linspace(0, np.pi / 2, n)).astype(np.dtype(dtype_str)); curve.setflags(write=False)
+    return curve
+
+def apply_fade_out(trimmed_audio, sr, fade_out_ms):
     # ======================== [优化开始] ========================
     if fade_out_ms > 0 and len(trimmed_audio) > 0:
         fade_samples = min(int(sr * fade_out_ms / 1000), len(trimmed_audio))
@@ -201,41 +831,228 @@ def trim_silence_numpy(audio, sr, threshold_db, padding_ms, fade_out_ms):
             # fade_curve = np.linspace(1.0, 0.0, fade_samples)
             
             # 优化后 (余弦曲线渐弱，听感更自然):
-            # 生成一个从0到π/2的序列，其cos值会平滑地从1降到0
-            fade_curve = np.cos(np.linspace(0, np.pi / 2, fade_samples))
+            # 生成一个从0到π/2的序列，其cos值会平滑地从1降到0（按长度缓存，批量处理时各文件复用）
+            fade_curve = _fade_curve(fade_samples, trimmed_audio.dtype.str)
             
-            trimmed_audio[-fade_samples:] *= fade_curve
+            # 多声道时将曲线广播到每个声道
+            trimmed_audio[-fade_samples:] *= fade_curve if trimmed_audio.ndim == 1 else fade_curve[:, None]
     # ======================== [优化结束] ========================
             
     return trimmed_audio
 
+def write_temp_audio(path, data):
+    """预览临时文件以原始 float32 数组 (.npy) 保存，采样率随结果字典传递，省去 WAV 的编码与解码。"""
+    np.save(path, np.ascontiguousarray(data, dtype=np.float32), allow_pickle=False)
+
+def load_temp_audio(path, mmap=False):
+    """读取 write_temp_audio 写出的临时文件；mmap=True 时以只读内存映射方式打开，按需分页读取。"""
+    return np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+
+# 处理结果随结果字典保留在内存中的最大帧数（约 47 秒 @ 44.1kHz），更长的文件保存时从临时文件读取
+RESULT_CACHE_MAX_FRAMES = 1 << 21
+# 整个批次在界面进程中缓存的处理结果总字节数上限；超出后到达的结果不再缓存，保存时从临时文件读取
+RESULT_CACHE_BUDGET_BYTES = 256 << 20
+
+def make_dsp_pipeline(options, parallel_dsp=False):
+    """
+    根据批次选项一次性组装“混音 → 重采样 → 标准化”处理链，返回 pipeline(data, sr, log_messages) -> (data, sr)。
+    已关闭的步骤不会进入链中，批次内每个文件只需执行实际启用的步骤，无需反复查询选项字典。
+    """
+    target_sr = options['target_sr'] if options['resample_enabled'] else None
+    to_mono = bool(options.get('convert_channels_enabled')); normalize = bool(options['normalize_enabled'])
+
+    def mono_step(data, sr, log_messages):
+        if data.ndim > 1 and data.shape[1] > 1: log_messages.append("  > 正在转换为单声道..."); data = downmix_to_mono(data)
+        return data, sr
+    def resample_step(data, sr, log_messages):
+        if sr != target_sr: log_messages.append(f"  > 正在重采样至 {target_sr} Hz..."); data = resample_audio(data, sr, target_sr); sr = target_sr
+        return data, sr
+    def normalize_step(data, sr, log_messages):
+        log_messages.append(f"  > 正在进行音量标准化 (RMS)..."); return rms_normalize(data, parallel=parallel_dsp), sr
+
+    steps = ([mono_step] if to_mono else []) + ([resample_step] if target_sr is not None else []) + ([normalize_step] if normalize else [])
+    fusable = to_mono and normalize
+
+    def pipeline(data, sr, log_messages):
+        if fusable and data.ndim > 1 and data.shape[1] > 1 and (target_sr is None or sr == target_sr):
+            # 无需重采样时，混音与标准化融合为一次遍历
+            log_messages.append("  > 正在转换为单声道..."); log_messages.append(f"  > 正在进行音量标准化 (RMS)...")
+            return downmix_and_normalize(data), sr
+        for step in steps: data, sr = step(data, sr, log_messages)
+        return data, sr
+    return pipeline
+
+def process_batch_file(row, filepath, options, temp_dir, pipeline=None):
+    """处理批量列表中的单个文件并生成预览临时文件，返回供 UI 更新的结果字典。pipeline 为 None 时按 options 临时组装。"""
+    filename = os.path.basename(filepath); log_messages = []
+    try:
+        skip_existing = options.get('skip_existing')
+        if skip_existing:
+            # “跳过”策略下先只读文件头推算输出路径，目标已存在则无需解码和处理
+            sr = options['target_sr'] if options['resample_enabled'] else sf.info(filepath).samplerate
+            output_dir = skip_existing['output_dir'] or os.path.dirname(filepath)
+            output_path = os.path.join(output_dir, build_output_filename(filepath, skip_existing['name_template'], skip_existing['output_format'], sr))
+            if os.path.exists(output_path):
+                return {'row': row, 'status': 'skipped', 'temp_path': None, 'log': f"  > 输出文件已存在，已跳过: {output_path}", 'data': None}
+        # 整个处理链保持 C 连续的 float32，保证各个 ufunc 都能走 SIMD 快速路径
+        with sf.SoundFile(filepath) as fin:
+            sr = fin.samplerate
+            # 超大文件的裁切改为先定位有声范围、再只解码该区间
+            stream_trim = options.get('trim_silence_enabled') and fin.frames > STREAM_THRESHOLD_FRAMES and fin.seekable()
+            if stream_trim:
+                log_messages.append("  > 正在裁切静音..."); data = read_trimmed(fin, options['trim_threshold_db'], options['trim_padding_ms'], options['trim_fade_out_ms'])
+            else: data = read_into_buffer(fin)
+        if options.get('trim_silence_enabled') and not stream_trim:
+            log_messages.append("  > 正在裁切静音..."); data = np.ascontiguousarray(trim_silence_numpy(data, sr, options['trim_threshold_db'], options['trim_padding_ms'], options['trim_fade_out_ms']))
+        if pipeline is None: pipeline = make_dsp_pipeline(options)
+        data, sr = pipeline(data, sr, log_messages)
+        # 临时文件名带上行号，避免不同目录下的同名文件在并行处理时互相覆盖
+        temp_filename = f"{os.path.splitext(filename)[0]}_{row}_temp.npy"; temp_path = os.path.join(temp_dir, temp_filename)
+        write_temp_audio(temp_path, data); log_messages.append(f"  > <font color='green'>预览生成成功!</font>")
+        # 较短的结果同时保留在内存中，保存时直接编码输出，省去一次临时文件的读取与解码
+        return {'row': row, 'status': 'processed', 'temp_path': temp_path, 'sr': sr, 'log': "<br>".join(log_messages), 'data': data if len(data) <= RESULT_CACHE_MAX_FRAMES else None,
+                'envelope': peak_envelope(data, WAVEFORM_ENVELOPE_POINTS)}
+    except Exception as e:
+        log_messages.append(f"  > <font color='red'>错误: {e}</font>"); return {'row': row, 'status': 'error', 'temp_path': None, 'log': "<br>".join(log_messages), 'data': None}
+
+# 结果信号的合并发送阈值：攒够一批或超过时间间隔才跨线程发送一次
+SIGNAL_BATCH_SIZE = 16
+SIGNAL_BATCH_INTERVAL = 0.1 # 秒
+
+def _file_size_or_zero(path):
+    try: return os.path.getsize(path)
+    except OSError: return 0
+
+def largest_first(paths):
+    """返回按文件大小从大到小排列的下标。并行处理时先提交大文件，避免批次末尾只剩一个长文件在单核上运行。"""
+    sizes = [_file_size_or_zero(p) for p in paths]
+    return sorted(range(len(paths)), key=sizes.__getitem__, reverse=True)
+
 class AudioProcessorWorker(QObject):
-    file_processed = pyqtSignal(dict); finished = pyqtSignal()
+    files_processed = pyqtSignal(list); finished = pyqtSignal()
     def __init__(self, file_data, options, temp_dir):
         super().__init__(); self.file_data = file_data; self.options = options; self.temp_dir = temp_dir; self._is_running = True
+        # 只有一个文件时没有文件级并发，改为在文件内部并行
+        self.pipeline = make_dsp_pipeline(options, parallel_dsp=len(file_data) == 1)
+        self._result_buf = []; self._last_flush = 0.0
+    def _flush(self):
+        if self._result_buf: self.files_processed.emit(self._result_buf); self._result_buf = []
+        self._last_flush = time.monotonic()
     def stop(self): self._is_running = False
+    def _process_one(self, row, filepath):
+        if not self._is_running: return None # 已停止时，尚未开始的任务直接跳过
+        return process_batch_file(row, filepath, self.options, self.temp_dir, self.pipeline)
     def run(self):
-        for i, item in enumerate(self.file_data):
-            if not self._is_running: break
-            filepath = item['original_path']; filename = os.path.basename(filepath); log_messages = []
+        warmup_dsp_kernels(parallel=len(self.file_data) == 1); self._last_flush = time.monotonic()
+        with ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS) as executor:
+            paths = [item['original_path'] for item in self.file_data]
+            futures = [executor.submit(self._process_one, i, paths[i]) for i in largest_first(paths)]
+            for future in as_completed(futures):
+                if not self._is_running: executor.shutdown(wait=True, cancel_futures=True); break
+                result = future.result()
+                if result is not None: self._result_buf.append(result)
+                if len(self._result_buf) >= SIGNAL_BATCH_SIZE or time.monotonic() - self._last_flush >= SIGNAL_BATCH_INTERVAL: self._flush()
+        self._flush(); self.finished.emit()
+
+# 输出扩展名 -> (libsndfile 容器格式, 编码子类型)，显式指定以跳过按扩展名推断格式
+OUTPUT_FORMATS = {
+    '.wav': ('WAV', 'PCM_16'),
+    '.flac': ('FLAC', 'PCM_16'),
+    '.ogg': ('OGG', 'VORBIS'),
+    '.mp3': ('MP3', 'MPEG_LAYER_III'),
+}
+
+# 可导入的音频扩展名，模块加载时构建一次
+_AUDIO_EXTS = frozenset({'.wav', '.mp3', '.flac', '.ogg'})
+
+def is_audio_file(name):
+    """按扩展名判断是否为支持的音频文件（rfind 切片，比 splitext 开销更小）。"""
+    dot = name.rfind('.')
+    return dot >= 0 and name[dot:].lower() in _AUDIO_EXTS
+
+def iter_audio_files(directory):
+    """
+    用 os.scandir 递归、惰性地产出目录下的音频文件；DirEntry 自带类型信息，无需逐项 stat。
+    与 os.walk 自顶向下的顺序一致：先产出当前目录的文件，再按列出顺序进入子目录。
+    """
+    subdirs = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False): subdirs.append(entry.path)
+                elif is_audio_file(entry.name): yield entry.path
+    except OSError: return
+    for sub in subdirs: yield from iter_audio_files(sub)
+
+# 文件名模板中支持的占位符；其余文本（包括 {{、}}、{original_name.x} 等）都按字面保留
+_NAME_PLACEHOLDER_PATTERN = re.compile(r'\{(original_name|samplerate|sr)\}')
+
+def render_name_template(template, mapping):
+    """用预编译的正则一次替换文件名模板中的已知占位符，其余内容与原先的逐个字面替换含义相同，不会因模板格式而抛出异常。"""
+    return _NAME_PLACEHOLDER_PATTERN.sub(lambda m: mapping[m.group(1)], template)
+
+def build_output_filename(original_path, name_template, output_format, sr):
+    """根据文件名模板生成输出文件名（不含目录）。处理阶段的跳过检查与保存阶段共用。"""
+    original_name = os.path.splitext(os.path.basename(original_path))[0]
+    return render_name_template(name_template, {"original_name": original_name, "samplerate": str(sr), "sr": str(sr)}) + output_format
+
+# 保存阶段每写出多少个文件处理一次界面事件
+SAVE_EVENTS_INTERVAL = 8
+
+class PreviewPlayer:
+    """
+    试听播放器：复用一个常驻的 sounddevice.OutputStream，由音频回调从当前缓冲中取数据。
+    新的播放请求直接替换缓冲并从头播放；采样率或声道数变化时才重建输出流。
+    解码放在 play_async 的后台线程中完成，界面线程不会因试听长文件而卡住。
+    """
+    PLAYBACK_BLOCK_FRAMES = 1024
+
+    def __init__(self):
+        self._stream = None; self._data = None; self._pos = 0; self._lock = threading.Lock()
+        # _control_lock 串行化流的创建、启动与关闭（可能来自界面线程或解码线程）；_generation 标识最新的试听请求
+        self._control_lock = threading.RLock(); self._generation = 0
+
+    def play(self, data, sr):
+        data = np.ascontiguousarray(data, dtype=np.float32)
+        if data.ndim == 1: data = data[:, None]
+        with self._control_lock:
+            with self._lock: self._data = data; self._pos = 0
+            if self._stream is None or self._stream.samplerate != sr or self._stream.channels != data.shape[1]:
+                self.close()
+                self._stream = sd.OutputStream(samplerate=sr, channels=data.shape[1], dtype='float32', blocksize=self.PLAYBACK_BLOCK_FRAMES, callback=self._callback)
+            # 上一段播放结束后流处于非活动状态，需要先 stop 再重新 start
+            if not self._stream.active: self._stream.stop(); self._stream.start()
+
+    def play_async(self, loader):
+        """
+        在后台线程中调用 loader() -> (data, sr) 完成解码，然后播放。
+        解码期间又发起了新的试听时，较早的请求在解码完成后直接丢弃，只播放最新的一个。
+        """
+        with self._control_lock: self._generation += 1; generation = self._generation
+        def worker():
             try:
-                data, sr = sf.read(filepath)
-                if self.options.get('trim_silence_enabled'):
-                    log_messages.append("  > 正在裁切静音..."); data = trim_silence_numpy(data, sr, self.options['trim_threshold_db'], self.options['trim_padding_ms'], self.options['trim_fade_out_ms'])
-                if self.options.get('convert_channels_enabled'):
-                    if data.ndim > 1 and data.shape[1] > 1: log_messages.append("  > 正在转换为单声道..."); data = np.mean(data, axis=1)
-                if self.options['resample_enabled'] and sr != self.options['target_sr']:
-                    log_messages.append(f"  > 正在重采样至 {self.options['target_sr']} Hz..."); num_samples = int(len(data) * self.options['target_sr'] / sr); data = np.interp(np.linspace(0, len(data), num_samples), np.arange(len(data)), data); sr = self.options['target_sr']
-                if self.options['normalize_enabled']:
-                    log_messages.append(f"  > 正在进行音量标准化 (RMS)..."); current_rms = np.sqrt(np.mean(data**2));
-                    if current_rms > 1e-9: gain = 0.1 / current_rms; data = np.clip(data * gain, -1.0, 1.0)
-                temp_filename = f"{os.path.splitext(filename)[0]}_temp.wav"; temp_path = os.path.join(self.temp_dir, temp_filename)
-                sf.write(temp_path, data, sr); log_messages.append(f"  > <font color='green'>预览生成成功!</font>")
-                result = {'row': i, 'status': 'processed', 'temp_path': temp_path, 'log': "<br>".join(log_messages)}
-            except Exception as e:
-                log_messages.append(f"  > <font color='red'>错误: {e}</font>"); result = {'row': i, 'status': 'error', 'temp_path': None, 'log': "<br>".join(log_messages)}
-            self.file_processed.emit(result)
-        self.finished.emit()
+                data, sr = loader()
+                with self._control_lock:
+                    if generation == self._generation: self.play(data, sr)
+            except Exception as e: print(f"播放失败: {e}")
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _callback(self, outdata, frames, time_info, status):
+        with self._lock:
+            data = self._data; pos = self._pos
+            n = 0 if data is None else min(frames, len(data) - pos)
+            if n > 0: outdata[:n] = data[pos:pos + n]; self._pos = pos + n
+        outdata[n:] = 0
+        if n < frames: raise sd.CallbackStop
+
+    def close(self):
+        """关闭输出流；尚在解码中的试听请求随之作废，不会在关闭后重新打开流。"""
+        with self._control_lock:
+            self._generation += 1
+            if self._stream is not None:
+                try: self._stream.stop(); self._stream.close()
+                except Exception: pass
+                self._stream = None
 
 # ==============================================================================
 # 2. UI 对话框 (核心修改)
@@ -245,6 +1062,10 @@ class BatchProcessorDialog(QDialog):
         super().__init__(parent); self.setAcceptDrops(True); self.icon_manager = icon_manager
         self.plugin_dir = os.path.dirname(__file__); self.temp_dir = os.path.join(self.plugin_dir, "temp")
         self._setup_temp_dir(); self.file_data = []
+        self._waveform_widgets = [] # 与 file_data 平行的波形控件列表，避免逐行调用 cellWidget()
+        self._paths_set = set() # file_data 中所有原始路径，用于 O(1) 去重
+        self._cached_bytes = 0 # file_data 中缓存的处理结果 ('data') 的总字节数，受 RESULT_CACHE_BUDGET_BYTES 限制
+        self._player = PreviewPlayer()
         self.setWindowTitle("批量音频处理器"); self.resize(1100, 800)
         self._init_ui(); self._load_icons(); self._connect_signals()
         if initial_filepaths: self.add_files_to_list(initial_filepaths)
@@ -346,9 +1167,8 @@ class BatchProcessorDialog(QDialog):
         """当表格选择项改变时，更新所有波形图的选中状态。"""
         selected_rows = {index.row() for index in self.file_table.selectedIndexes()}
     
-        for row in range(self.file_table.rowCount()):
-            widget = self.file_table.cellWidget(row, 1)
-            if isinstance(widget, WaveformWidget):
+        for row, widget in enumerate(self._waveform_widgets):
+            if widget is not None:
                 widget.set_selected(row in selected_rows)
 
     def resizeEvent(self, event):
@@ -377,12 +1197,22 @@ class BatchProcessorDialog(QDialog):
         return super().eventFilter(source, event)
 
     def add_files_to_list(self, filepaths):
-        for path in filepaths:
-            if any(item['original_path'] == path for item in self.file_data): continue
-            display_text = os.path.basename(path)
-            new_item_data = {'original_path': path, 'status': 'pending', 'temp_path': None, 'log': '待处理', 'display_text': display_text}
-            self.file_data.append(new_item_data)
-            row = self.file_table.rowCount(); self.file_table.insertRow(row); self._update_table_row(row)
+        # 批量插入期间暂停表格重绘，结束后只做一次布局
+        self.file_table.setUpdatesEnabled(False)
+        try:
+            for path in filepaths: self._append_file_row(path)
+        finally: self.file_table.setUpdatesEnabled(True)
+
+    def _append_file_row(self, path):
+        if path in self._paths_set: return
+        self._paths_set.add(path)
+        display_text = os.path.basename(path)
+        new_item_data = {'original_path': path, 'status': 'pending', 'temp_path': None, 'log': '待处理', 'display_text': display_text}
+        row = self.file_table.rowCount(); self.file_table.insertRow(row)
+        # 波形控件只在插入行时创建一次，之后的状态更新只刷新其数据
+        waveform_widget = WaveformWidget(self); self.file_table.setCellWidget(row, 1, waveform_widget)
+        self.file_data.append(new_item_data); self._waveform_widgets.append(waveform_widget)
+        self._update_table_row(row); self.file_table.resizeRowToContents(row)
 
     def _update_table_row(self, row):
         if row >= len(self.file_data): return
@@ -390,7 +1220,7 @@ class BatchProcessorDialog(QDialog):
         
         # 更新第一列：文件名和状态图标
         table_item = QTableWidgetItem(item_data['display_text'])
-        status = item_data['status']; status_text = {'pending': '待处理', 'processed': '已处理, 未保存', 'error': '处理失败', 'saved': '已保存'}.get(status, '未知')
+        status = item_data['status']; status_text = {'pending': '待处理', 'processed': '已处理, 未保存', 'error': '处理失败', 'saved': '已保存', 'skipped': '已跳过 (输出已存在)'}.get(status, '未知')
         icon = self.icons.get('success') if status == 'processed' else self.icons.get(status, self.icons['pending'])
         table_item.setIcon(icon)
         tooltip_parts = [f"<b>原始路径:</b> {item_data['original_path']}", "<hr>", f"<b>状态:</b> {status_text}"]
@@ -399,13 +1229,16 @@ class BatchProcessorDialog(QDialog):
         table_item.setToolTip("<br>".join(tooltip_parts))
         self.file_table.setItem(row, 0, table_item)
         
-        # [核心修改] 更新第二列：波形图
-        waveform_widget = WaveformWidget(self)
-        self.file_table.setCellWidget(row, 1, waveform_widget)
+        # [核心修改] 更新第二列：波形图（复用插入行时创建的控件）
+        waveform_widget = self._waveform_widgets[row]
         if item_data['status'] in ['processed', 'saved'] and item_data.get('temp_path'):
-            waveform_widget.set_waveform_data(item_data['temp_path'])
-        self.file_table.resizeRowToContents(row)
-        self._on_selection_changed()
+            # 优先使用处理线程已算好的包络，避免在界面线程读取整个临时文件
+            if item_data.get('envelope') is not None: waveform_widget.set_envelope(item_data['envelope'])
+            else: waveform_widget.set_waveform_data(item_data['temp_path'])
+        else: waveform_widget.set_envelope(None)
+
+    def _get_save_options(self):
+        return {'output_dir': self.output_dir_edit.text().strip(), 'name_template': self.name_template_edit.text().strip(), 'output_format': self.output_format_combo.currentText(), 'conflict_policy': 'overwrite' if self.overwrite_radio.isChecked() else 'rename' if self.rename_radio.isChecked() else 'skip'}
 
     def _get_options(self):
         return {'trim_silence_enabled': self.trim_silence_check.isChecked(), 'trim_threshold_db': self.trim_threshold_slider.value(), 'trim_padding_ms': self.trim_padding_slider.value(), 'trim_fade_out_ms': self.trim_fade_out_slider.value(), 'resample_enabled': self.resample_check.isChecked(), 'target_sr': int(self.sr_combo.currentText()), 'convert_channels_enabled': self.convert_channels_check.isChecked(), 'normalize_enabled': self.normalize_check.isChecked()}
@@ -413,50 +1246,73 @@ class BatchProcessorDialog(QDialog):
     def _start_processing(self):
         if not AUDIO_LIBS_AVAILABLE: QMessageBox.critical(self, "依赖缺失", "无法处理，'numpy'或'soundfile'库未安装。"); return
         if not self.file_data: QMessageBox.warning(self, "无文件", "请先添加要处理的音频文件。"); return
-        for item in self.file_data: item['status'] = 'pending'; item['log'] = '正在排队...'
+        for item in self.file_data: item['status'] = 'pending'; item['log'] = '正在排队...'; item.pop('data', None)
+        self._cached_bytes = 0
         for i in range(len(self.file_data)): self._update_table_row(i)
-        self.progress_bar.setValue(0); self.set_ui_enabled(False)
-        self.thread = QThread(); self.worker = AudioProcessorWorker(self.file_data, self._get_options(), self.temp_dir)
+        self.progress_bar.setValue(0); self.set_ui_enabled(False); self._processed_count = 0
+        options = self._get_options(); save_options = self._get_save_options()
+        # 冲突策略为“跳过”时，输出已存在的文件在处理阶段就直接跳过
+        if save_options['conflict_policy'] == 'skip' and save_options['name_template']: options['skip_existing'] = save_options
+        self.thread = QThread(); self.worker = AudioProcessorWorker(self.file_data, options, self.temp_dir)
         self.worker.moveToThread(self.thread); self.thread.started.connect(self.worker.run)
         self.worker.finished.connect(self.thread.quit); self.worker.finished.connect(self.worker.deleteLater); self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.finished.connect(lambda: self.set_ui_enabled(True, processing_done=True)); self.worker.file_processed.connect(self._on_file_processed)
+        self.thread.finished.connect(lambda: self.set_ui_enabled(True, processing_done=True)); self.worker.files_processed.connect(self._on_files_processed)
         self.thread.start()
 
-    def _on_file_processed(self, result):
-        row = result['row'];
-        if row < len(self.file_data): self.file_data[row].update(result); self._update_table_row(row); self.progress_bar.setValue(int((row + 1) / len(self.file_data) * 100))
+    def _on_files_processed(self, results):
+        for result in results:
+            row = result['row']; self._processed_count += 1 # 并行处理时结果乱序到达，按完成数量计算进度
+            data = result.get('data')
+            if data is not None:
+                # 按整个批次的总字节数限制缓存：超出预算的结果只保留临时文件
+                if self._cached_bytes + data.nbytes > RESULT_CACHE_BUDGET_BYTES: result['data'] = None
+                else: self._cached_bytes += data.nbytes
+            if row < len(self.file_data): self.file_data[row].update(result); self._update_table_row(row)
+        if self.file_data: self.progress_bar.setValue(int(self._processed_count / len(self.file_data) * 100))
         
     def _start_saving(self):
-        output_format = self.output_format_combo.currentText()
-        options = {'output_dir': self.output_dir_edit.text().strip(), 'name_template': self.name_template_edit.text().strip(), 'conflict_policy': 'overwrite' if self.overwrite_radio.isChecked() else 'rename' if self.rename_radio.isChecked() else 'skip'}
+        options = self._get_save_options(); output_format = options['output_format']; sf_format, sf_subtype = OUTPUT_FORMATS[output_format]
         if not options['name_template']: QMessageBox.warning(self, "模板无效", "文件名模板不能为空。"); return
-        processed_files = [item for item in self.file_data if item['status'] == 'processed']
+        processed_files = [(row, item) for row, item in enumerate(self.file_data) if item['status'] == 'processed']
         if not processed_files: QMessageBox.information(self, "无文件可保存", "没有成功处理的文件可供保存。"); return
-        saved_count = 0
-        for item in processed_files:
+        saved_count = 0; existing_names = {} # {output_dir: 目录中已有文件名的集合}，每个目录只扫描一次
+        next_suffix = {} # {(output_dir, 基础名): 下一个待尝试的序号}，同名文件连续重命名时无需从 _1 重新查找
+        for i, (row, item) in enumerate(processed_files):
             try:
                 output_dir = options['output_dir'] or os.path.dirname(item['original_path']); os.makedirs(output_dir, exist_ok=True)
-                sr = sf.info(item['temp_path']).samplerate; original_name = os.path.splitext(os.path.basename(item['original_path']))[0]
-                replacements = {"{original_name}": original_name, "{samplerate}": str(sr), "{sr}": str(sr)}
-                new_base_name = options['name_template'];
-                for placeholder, value in replacements.items(): new_base_name = new_base_name.replace(placeholder, value)
+                # 采样率由处理线程随结果给出（临时文件为无文件头的原始数组）
+                sr = item['sr']
+                output_filename = build_output_filename(item['original_path'], options['name_template'], output_format, sr)
+                new_base_name = output_filename[:-len(output_format)]
                 
-                output_path = os.path.join(output_dir, f"{new_base_name}{output_format}")
+                if output_dir not in existing_names:
+                    # 目录无法列出时记为 None，此后对该目录逐个文件检查是否存在，而不是当作空目录直接覆盖
+                    try: existing_names[output_dir] = {os.path.normcase(entry.name) for entry in os.scandir(output_dir)}
+                    except OSError: existing_names[output_dir] = None
+                names = existing_names[output_dir]
+                name_taken = (lambda name: os.path.exists(os.path.join(output_dir, name))) if names is None else (lambda name: os.path.normcase(name) in names)
                 
-                if os.path.exists(output_path):
+                if name_taken(output_filename):
                     if options['conflict_policy'] == 'skip': continue
                     elif options['conflict_policy'] == 'rename':
-                        n = 1
-                        while os.path.exists(output_path): output_path = os.path.join(output_dir, f"{new_base_name}_{n}{output_format}"); n += 1
+                        suffix_key = (output_dir, os.path.normcase(new_base_name)); n = next_suffix.get(suffix_key, 1)
+                        while name_taken(f"{new_base_name}_{n}{output_format}"): n += 1
+                        output_filename = f"{new_base_name}_{n}{output_format}"; next_suffix[suffix_key] = n + 1
+                output_path = os.path.join(output_dir, output_filename)
                 
                 # [核心修改] 读取临时WAV并按指定格式保存
-                data, sr = sf.read(item['temp_path'])
-                sf.write(output_path, data, sr)
+                # 优先使用处理阶段缓存在内存中的结果；取出后即释放（to_pcm16 会原地改写该缓冲）
+                data = self._take_cached_data(item)
+                if data is None: data = load_temp_audio(item['temp_path'])
+                if sf_subtype == 'PCM_16': data = to_pcm16(data) # 预先量化，libsndfile 直接写入整数样本
+                sf.write(output_path, data, sr, format=sf_format, subtype=sf_subtype)
+                if names is not None: names.add(os.path.normcase(output_filename))
                 
                 item['status'] = 'saved'; item['log'] += f"<br>  > <font color='blue'>已保存至 {os.path.basename(output_path)}</font>"; saved_count += 1
             except Exception as e:
                 item['status'] = 'error'; item['log'] += f"<br>  > <font color='red'>保存失败: {e}</font>"
-            self._update_table_row(self.file_data.index(item)); QApplication.processEvents()
+            self._update_table_row(row)
+            if i % SAVE_EVENTS_INTERVAL == 0: QApplication.processEvents() # 每保存若干个文件才处理一次事件循环
         QMessageBox.information(self, "保存完成", f"成功保存 {saved_count} 个文件。")
 
     def _show_context_menu(self, position):
@@ -475,13 +1331,14 @@ class BatchProcessorDialog(QDialog):
         original_path = self.file_data[row]['original_path']
         if original_path and os.path.exists(original_path): self._robust_play_sound(original_path)
     def _play_processed_audio(self, row):
-        temp_path = self.file_data[row]['temp_path']
-        if temp_path and os.path.exists(temp_path): self._robust_play_sound(temp_path)
+        item_data = self.file_data[row]; temp_path = item_data['temp_path']
+        if temp_path and os.path.exists(temp_path):
+            # 在后台线程中读取；播放器会持有缓冲直到下一次播放，这里完整读入而不使用内存映射，以免占用临时文件导致其无法删除
+            sr = item_data['sr']
+            self._player.play_async(lambda: (load_temp_audio(temp_path), sr))
     def _robust_play_sound(self, path):
-        playback_thread = threading.Thread(target=self._play_sound_task, args=(path,), daemon=False); playback_thread.start()
-    def _play_sound_task(self, path):
-        try: data, sr = sf.read(path); sd.play(data, sr); sd.wait()
-        except Exception as e: print(f"播放失败: {e}")
+        # 在后台线程中解码原文件；输出设备原生支持 float32，无需 float64 缓冲
+        self._player.play_async(lambda: sf.read(path, dtype='float32'))
     def _open_in_explorer(self, row):
         path = os.path.dirname(self.file_data[row]['original_path'])
         try:
@@ -489,14 +1346,19 @@ class BatchProcessorDialog(QDialog):
             elif sys.platform == 'darwin': os.system(f'open "{path}"')
             else: os.system(f'xdg-open "{path}"')
         except Exception as e: QMessageBox.critical(self, "打开失败", f"无法打开文件夹: {e}")
+    def _take_cached_data(self, item):
+        """取出并释放条目缓存的处理结果（没有时返回 None），同时从缓存总字节数中扣除。"""
+        data = item.pop('data', None)
+        if data is not None: self._cached_bytes -= data.nbytes
+        return data
     def _remove_item(self, row):
-        item_data = self.file_data.pop(row)
+        item_data = self.file_data.pop(row); self._waveform_widgets.pop(row); self._paths_set.discard(item_data['original_path']); self._take_cached_data(item_data)
         if item_data['temp_path'] and os.path.exists(item_data['temp_path']):
             try: os.remove(item_data['temp_path'])
             except OSError: pass
         self.file_table.removeRow(row)
     def clear_all_files(self):
-        self._setup_temp_dir(); self.file_data.clear(); self.file_table.setRowCount(0); self.save_btn.setEnabled(False)
+        self._setup_temp_dir(); self.file_data.clear(); self._waveform_widgets.clear(); self._paths_set.clear(); self._cached_bytes = 0; self.file_table.setRowCount(0); self.save_btn.setEnabled(False)
     def set_ui_enabled(self, enabled, processing_done=False):
         self.process_btn.setEnabled(enabled); self.process_btn.setText("1. 处理并生成预览" if enabled else "处理中...")
         self.save_btn.setEnabled(enabled and processing_done)
@@ -505,31 +1367,23 @@ class BatchProcessorDialog(QDialog):
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls(): event.acceptProposedAction()
     def dropEvent(self, event):
-        filepaths_to_add = []; supported_exts = ('.wav', '.mp3', '.flac', '.ogg')
+        filepaths_to_add = []
         for url in event.mimeData().urls():
             path = url.toLocalFile()
-            if os.path.isdir(path):
-                for root, _, files in os.walk(path):
-                    for name in files:
-                        if name.lower().endswith(supported_exts): filepaths_to_add.append(os.path.join(root, name))
-            elif os.path.isfile(path) and path.lower().endswith(supported_exts): filepaths_to_add.append(path)
+            if os.path.isdir(path): filepaths_to_add.extend(iter_audio_files(path))
+            elif os.path.isfile(path) and is_audio_file(path): filepaths_to_add.append(path)
         self.add_files_to_list(filepaths_to_add)
     def _add_files(self):
         filepaths, _ = QFileDialog.getOpenFileNames(self, "选择音频文件", "", "音频文件 (*.wav *.mp3 *.flac *.ogg)");
         if filepaths: self.add_files_to_list(filepaths)
     def _add_folder(self):
         directory = QFileDialog.getExistingDirectory(self, "选择包含音频的文件夹")
-        if directory:
-            filepaths_to_add = []; supported_exts = ('.wav', '.mp3', '.flac', '.ogg')
-            for root, _, files in os.walk(directory):
-                for name in files:
-                    if name.lower().endswith(supported_exts): filepaths_to_add.append(os.path.join(root, name))
-            self.add_files_to_list(filepaths_to_add)
+        if directory: self.add_files_to_list(iter_audio_files(directory))
     def _browse_output_dir(self):
         directory = QFileDialog.getExistingDirectory(self, "选择输出文件夹");
         if directory: self.output_dir_edit.setText(directory)
     def closeEvent(self, event):
-        self._cleanup_temp_folder(); super().closeEvent(event)
+        self._player.close(); self._cleanup_temp_folder(); super().closeEvent(event)
     def _cleanup_temp_folder(self):
         if os.path.exists(self.temp_dir): shutil.rmtree(self.temp_dir)
 
@@ -540,13 +1394,24 @@ class BatchProcessorPlugin(BasePlugin):
     def __init__(self, main_window, plugin_manager):
         super().__init__(main_window, plugin_manager)
         self.dialog_instance = None
+        # 自动修复共用一个线程池和一个信号路由器，不再为每个损坏文件创建新的 QThread 与 worker
+        self._fix_pool = QThreadPool()
+        self._fix_pool.setMaxThreadCount(max(2, QThread.idealThreadCount() - 1))
+        self._fix_signals = AutoFixSignals()
+        self._fix_signals.success.connect(self._on_auto_fix_success)
+        self._fix_signals.failure.connect(self._on_auto_fix_failure)
+        self._fix_callbacks = {}; self._next_fix_id = 0
     def setup(self):
         self.audio_manager_page = getattr(self.main_window, 'audio_manager_page', None)
         if not self.audio_manager_page: print("[Batch Processor] 错误: 未找到音频管理器模块。"); return False
         setattr(self.audio_manager_page, 'batch_processor_plugin_active', self)
+        # 在后台线程中预热 numba 内核，用户第一次执行“一键标准化”时不再等待 JIT 编译
+        if NUMBA_AVAILABLE: threading.Thread(target=warmup_dsp_kernels, daemon=True).start()
         print("[Batch Processor] 已向音频管理器注册。")
         return True
     def teardown(self):
+        # 丢弃尚未开始的修复任务，等待正在写回的任务完成，避免留下临时文件
+        self._fix_pool.clear(); self._fix_pool.waitForDone()
         if hasattr(self, 'audio_manager_page') and hasattr(self.audio_manager_page, 'batch_processor_plugin_active'):
             delattr(self.audio_manager_page, 'batch_processor_plugin_active')
             print("[Batch Processor] 已从音频管理器注销。")
@@ -597,9 +1462,13 @@ class BatchProcessorPlugin(BasePlugin):
         # 步骤 2: 在执行前，重置音频管理器的播放器以释放文件句柄
         if self.audio_manager_page and hasattr(self.audio_manager_page, 'reset_player'):
             self.audio_manager_page.reset_player()
-            QApplication.processEvents() # 确保事件循环处理完请求
 
-        # 步骤 3: 设置并运行后台工作器
+        # 步骤 3: 推迟到事件循环的下一轮再启动工作器，让 reset_player 排队的释放操作先执行完，
+        # 避免在此处调用 processEvents() 重入事件循环
+        QTimer.singleShot(0, partial(self._start_quick_normalize_worker, filepaths))
+
+    def _start_quick_normalize_worker(self, filepaths):
+        """设置进度对话框并在后台线程中运行“一键标准化”工作器。"""
         from PyQt5.QtWidgets import QProgressDialog
 
         self.progress_dialog = QProgressDialog("正在准备处理...", "取消", 0, 100, self.main_window)
@@ -612,8 +1481,8 @@ class BatchProcessorPlugin(BasePlugin):
         self.worker.moveToThread(self.thread)
 
         self.progress_dialog.canceled.connect(self.worker.stop)
-        self.worker.progress.connect(self.progress_dialog.setValue)
-        self.worker.progress.connect(lambda val, msg: self.progress_dialog.setLabelText(msg))
+        # 一个信号连接到一个槽，同时更新进度值与说明文字
+        self.worker.progress.connect(self._on_quick_normalize_progress)
         
         self.worker.finished_with_refresh_request.connect(self.on_quick_normalize_finished)
 
@@ -623,6 +1492,10 @@ class BatchProcessorPlugin(BasePlugin):
         
         self.thread.start()
 
+    def _on_quick_normalize_progress(self, value, message):
+        if self.progress_dialog:
+            self.progress_dialog.setLabelText(message); self.progress_dialog.setValue(value)
+
     # [新增] 快速标准化完成后的回调函数
     def on_quick_normalize_finished(self):
         self.thread.quit()
@@ -637,73 +1510,18 @@ class BatchProcessorPlugin(BasePlugin):
             self.audio_manager_page.populate_audio_table()
     # [已修正] 用于自动修复单个文件的后台工作器
     def _run_auto_fix_worker(self, filepath, on_success_callback):
-        """这是一个内部方法，负责启动后台线程来执行修复任务。"""
-        
-        class AutoFixWorker(QObject):
-            success = pyqtSignal(str)
-            failure = pyqtSignal(str)
-            finished = pyqtSignal()
-
-            def __init__(self, path_to_fix):
-                super().__init__()
-                self.path_to_fix = path_to_fix
-
-            def run(self):
-                try:
-                    # 1. 尝试创建备份
-                    try:
-                        backup_path = self.path_to_fix + ".bak"
-                        shutil.copy2(self.path_to_fix, backup_path)
-                    except Exception as backup_e:
-                        print(f"Warning: Could not create backup for {self.path_to_fix}: {backup_e}")
-                    
-                    # 2. 准备目标路径
-                    base_path, old_ext = os.path.splitext(self.path_to_fix)
-                    target_filepath = base_path + ".wav"
-                    
-                    # 3. 读取和处理音频数据
-                    data, sr = sf.read(self.path_to_fix)
-                    if data.ndim > 1: data = np.mean(data, axis=1)
-                    if sr != 44100:
-                        num_samples = int(len(data) * 44100 / sr)
-                        data = np.interp(np.linspace(0, len(data), num_samples), np.arange(len(data)), data)
-                        sr = 44100
-                    current_rms = np.sqrt(np.mean(data**2))
-                    if current_rms > 1e-9:
-                        gain = 0.1 / current_rms
-                        data = np.clip(data * gain, -1.0, 1.0)
-                    
-                    # 4. 写入修复后的文件（可能会覆盖原文件）
-                    sf.write(target_filepath, data, sr, format='WAV')
-                    
-                    # --- [核心修正] ---
-                    # 5. 只有在发生了格式转换时 (即输入和输出文件名不同)，才删除原始文件。
-                    if old_ext.lower() != ".wav" and os.path.exists(self.path_to_fix):
-                        os.remove(self.path_to_fix)
-                    # --- 修正结束 ---
-
-                    # 6. 报告成功
-                    self.success.emit(target_filepath)
-
-                except Exception as e:
-                    self.failure.emit(str(e))
-                finally:
-                    self.finished.emit()
-
-        # 创建并启动线程 (这部分逻辑不变)
-        self.fix_thread = QThread()
-        self.fix_worker = AutoFixWorker(filepath)
-        self.fix_worker.moveToThread(self.fix_thread)
-        
-        self.fix_worker.success.connect(on_success_callback)
-        self.fix_worker.failure.connect(lambda msg: print(f"自动修复失败: {msg}"))
-        
-        self.fix_worker.finished.connect(self.fix_thread.quit)
-        self.fix_thread.finished.connect(self.fix_thread.deleteLater)
-        self.fix_worker.finished.connect(self.fix_worker.deleteLater)
-        
-        self.fix_thread.started.connect(self.fix_worker.run)
-        self.fix_thread.start()
+        """这是一个内部方法，负责把修复任务提交到插件共享的线程池。"""
+        fix_id = self._next_fix_id; self._next_fix_id += 1
+        self._fix_callbacks[fix_id] = on_success_callback
+        self._fix_pool.start(AutoFixRunnable(fix_id, filepath, self._fix_signals))
+
+    def _on_auto_fix_success(self, fix_id, target_filepath):
+        callback = self._fix_callbacks.pop(fix_id, None)
+        if callback: callback(target_filepath)
+
+    def _on_auto_fix_failure(self, fix_id, message):
+        self._fix_callbacks.pop(fix_id, None)
+        print(f"自动修复失败: {message}")
 
 
     # [已修正] 插件新的公共API，供外部调用
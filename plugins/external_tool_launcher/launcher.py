@@ -1,16 +1,20 @@
 import os
+import re
 import sys
+import copy
 import json
+import shlex
 import subprocess
 import uuid
-from functools import partial
+from types import MappingProxyType
+from functools import partial, lru_cache
 
 # PyQt5 GUI 模块导入
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
                              QLineEdit, QFileDialog, QMessageBox, QAction, QListWidget,
                              QListWidgetItem, QSplitter, QFormLayout, QGroupBox,
                              QCheckBox, QTextEdit, QApplication, QMenu, QComboBox)
-from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtCore import Qt, QSize, QTimer
 from PyQt5.QtGui import QIcon
 
 # 尝试从主程序环境中导入 BasePlugin。
@@ -22,6 +26,140 @@ except ImportError:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'modules')))
     from plugin_system import BasePlugin
 
+# 可选依赖：orjson 的解析和序列化都比标准库 json 快数倍，不可用时回退到标准库
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def parse_config(data):
+    """将 config.json 的原始字节解析为 Python 对象。解析失败时抛出 json.JSONDecodeError（orjson 的异常是其子类）。"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    # 标准库 json.loads 可直接接受 UTF-8 字节串
+    return json.loads(data)
+
+def serialize_config(settings):
+    """
+    将配置序列化为 UTF-8 字节串。默认输出紧凑格式（更小、更快）；
+    设置环境变量 PHONACQ_DEBUG_CONFIG 时输出 4 空格缩进的格式，便于手工查看和编辑。
+    """
+    if os.environ.get('PHONACQ_DEBUG_CONFIG'):
+        return json.dumps(settings, indent=4, ensure_ascii=False).encode('utf-8')
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(settings)
+    # `ensure_ascii=False` 确保中文字符原样写入
+    return json.dumps(settings, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+# 命令模板中支持的占位符。注意 {filepaths_quoted} 必须排在 {filepaths} 之前，
+# {filepath_quoted} 必须排在 {filepath} 之前，以保证正则优先匹配较长的占位符。
+_PLACEHOLDER_PATTERN = re.compile(r'(\{tool_path\}|\{filepaths_quoted\}|\{filepaths\}|\{filepath_quoted\}|\{filepath\})')
+
+@lru_cache(maxsize=64)
+def compile_command_template(command_template):
+    """
+    将命令模板预先拆分为“字面文本 / 占位符”交替的片段元组，并按模板字符串缓存。
+    启动工具时只需对片段做一次字典查找并拼接，无需对整个模板做多次 str.replace；
+    同时，被替换进来的文件路径中即使包含类似 {filepath} 的文本，也不会被再次替换。
+    模板被修改后其字符串不同，自然会重新编译，无需额外的失效处理。
+    """
+    return tuple(seg for seg in _PLACEHOLDER_PATTERN.split(command_template) if seg)
+
+# argv 模式下 *_quoted 占位符对应的不加引号版本：引号只对 Windows 的命令行字符串有意义，
+# 直接作为 argv 传给程序时，字面的 " 会成为文件名的一部分
+_ARGV_UNQUOTED_PLACEHOLDERS = {"{filepaths_quoted}": "{filepaths}", "{filepath_quoted}": "{filepath}"}
+
+@lru_cache(maxsize=64)
+def compile_command_argv(command_template):
+    """
+    (仅用于 POSIX) 按 shell 的规则将命令模板拆分为参数列表，再把每个参数预编译为片段元组，并按模板字符串缓存。
+    先拆分、后替换：模板中的引号在拆分时即被消化，被替换进来的文件路径即使包含空格、引号或 $ 也不会被重新解析。
+    拆分的同时把 {filepaths_quoted} / {filepath_quoted} 换成不加引号的 {filepaths} / {filepath}。
+    模板引号不匹配时 shlex 会抛出 ValueError。
+    """
+    return tuple(tuple(_ARGV_UNQUOTED_PLACEHOLDERS.get(seg, seg) for seg in compile_command_template(token))
+                 for token in shlex.split(command_template))
+
+# 占位符 -> 取值函数 (tool_path, filepaths) 的分派表
+_PLACEHOLDER_RESOLVERS = {
+    "{tool_path}": lambda tool_path, filepaths: tool_path,
+    # 用分隔符 '" "' 对原列表做一次 join 再补上首尾引号，不为每个路径生成带引号的临时字符串
+    "{filepaths_quoted}": lambda tool_path, filepaths: '"' + '" "'.join(filepaths) + '"' if filepaths else "",
+    "{filepaths}": lambda tool_path, filepaths: " ".join(filepaths),
+    "{filepath_quoted}": lambda tool_path, filepaths: f'"{filepaths[0]}"' if filepaths else "",
+    "{filepath}": lambda tool_path, filepaths: filepaths[0] if filepaths else "",
+}
+
+def resolve_placeholder(segment, tool_path, filepaths):
+    """
+    返回模板片段替换后的文本，非占位符片段原样返回。每个片段只需一次字典查找即可分派。
+    按需计算：只有模板实际引用 {filepaths} / {filepaths_quoted} 时才拼接整个文件列表，
+    只用 {filepath_quoted} 的模板（如 Praat 脚本）在选中大量文件时不会生成多余的长字符串。
+    注意：替换时不添加额外的引号，{tool_path} 的引号由模板自身提供。
+    """
+    resolver = _PLACEHOLDER_RESOLVERS.get(segment)
+    return resolver(tool_path, filepaths) if resolver is not None else segment
+
+def build_command_argv(command_template, resolve, filepaths):
+    """
+    (仅用于 POSIX) 根据模板和占位符取值构建 argv 列表，供 shell=False 的 Popen 直接执行。
+    单独成为一个参数的 {filepaths} / {filepaths_quoted} 展开为每个文件一个参数；
+    占位符与其他文本相连时，按替换后的文本拼接为一个参数。*_quoted 占位符在这里都按不加引号的路径替换。
+    :param command_template: 命令模板字符串。
+    :param resolve: 将模板片段映射为替换文本的函数（见 resolve_placeholder）。
+    :param filepaths: 选中的文件路径列表。
+    :return: 参数列表。
+    """
+    argv = []
+    for segments in compile_command_argv(command_template):
+        if segments == ("{filepaths}",):
+            argv.extend(filepaths)
+        else:
+            argv.append("".join(map(resolve, segments)))
+    return argv
+
+@lru_cache(maxsize=128)
+def parse_supported_formats(supported_formats_str):
+    """
+    将“支持的格式”字符串（如 ".wav, .mp3"）解析为小写扩展名的 frozenset，并按字符串缓存。
+    右键菜单每次弹出时无需重新拆分字符串，匹配也由线性查找变为集合运算；
+    多个工具使用相同的格式字符串时共享同一个集合对象。
+    省略了点号的条目（如 "wav"）会补全为 ".wav"，与 file_extension 的返回值保持一致。
+    """
+    exts = (f.strip().lower() for f in supported_formats_str.split(','))
+    return frozenset(e if e.startswith('.') else '.' + e for e in exts if e)
+
+def file_extension(path):
+    """
+    返回小写的文件扩展名（含点号），没有扩展名时返回空字符串。
+    只做两次从右向左的 C 级查找，比 os.path.splitext 的通用处理更轻量；
+    与 splitext 一样，点号必须位于文件名内部（忽略目录名中的点号和以点号开头的隐藏文件名）。
+    """
+    dot = path.rfind('.')
+    sep = max(path.rfind('/'), path.rfind('\\'))
+    return path[dot:].lower() if dot > sep + 1 else ""
+
+# 内置的“用系统默认播放器打开”工具的配置（只读模板，注入配置时复制）
+SYSTEM_DEFAULT_PLAYER_TOOL = MappingProxyType({
+    "id": "system_default_player",
+    "type": "simple_open", # 这是一个“简单文件打开”类型的工具
+    "name": "用系统默认播放器打开",
+    "path": "system_handler", # 特殊标识符，实际由插件内部处理，不指向真实路径
+    "supported_formats": ".wav, .mp3, .flac, .aiff, .ogg, .m4a", # 支持的音频格式
+    "enabled": True
+})
+
+# 默认的Praat工具示例（高级程序启动类型）的只读模板，复制时再分配新的 "id"
+DEFAULT_PRAAT_TOOL = MappingProxyType({
+    "type": "advanced", # 原来的“简单程序启动”现在是“高级”
+    "name": "用 Praat 打开",
+    "path": "", # 用户需自行配置Praat路径
+    "supported_formats": ".wav, .mp3, .flac, .aiff, .ogg",
+    "command_template": '"{tool_path}" --open {filepaths_quoted}', # 典型的Praat打开命令
+    "enabled": True
+})
+
 # ==============================================================================
 # 1. LauncherConfigManager - 插件专属配置管理器
 # ==============================================================================
@@ -30,10 +168,44 @@ class LauncherConfigManager:
     负责外部工具启动器插件的配置读写和管理。
     配置存储在插件目录下的 `config.json` 文件中。
     """
+    # 连续编辑时合并写盘的延迟（毫秒）
+    SAVE_DEBOUNCE_MS = 200
+    # 已解析配置的进程级缓存：config_path -> (st_mtime_ns, st_size, settings)。
+    # 文件未被修改时，重新创建管理器无需再次读取、解析和规范化 config.json。
+    _load_cache = {}
+
     def __init__(self):
         plugin_dir = os.path.dirname(__file__)
         self.config_path = os.path.join(plugin_dir, 'config.json')
         self.settings = self._load()
+        self._save_pending = False # 是否已有一次延迟保存在等待执行
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        """重建 工具ID -> 列表下标 的索引（按ID查找、更新工具时无需线性扫描），以及各工具支持的扩展名集合。"""
+        self._index = {tool.get('id'): i for i, tool in enumerate(self.get_tools())}
+        self._enabled_cache = None # 已启用工具列表，按需重新计算
+        self._ext_sets = {tool.get('id'): self._compute_ext_set(tool) for tool in self.get_tools()}
+
+    @staticmethod
+    def _compute_ext_set(tool):
+        """
+        解析工具支持的扩展名集合。“简单文件打开”类型且格式为 ".*" 的工具支持所有文件类型，返回 None。
+        """
+        supported_formats_str = tool.get('supported_formats', '')
+        if tool.get('type') == 'simple_open' and supported_formats_str == ".*":
+            return None
+        return parse_supported_formats(supported_formats_str)
+
+    def get_supported_exts(self, tool):
+        """
+        返回工具支持的小写扩展名 frozenset（None 表示支持所有类型）。
+        集合在加载和更新工具时预先计算好，右键菜单弹出时无需再解析格式字符串。
+        """
+        tool_id = tool.get('id')
+        if tool_id not in self._ext_sets:
+            self._ext_sets[tool_id] = self._compute_ext_set(tool)
+        return self._ext_sets[tool_id]
 
     def _load(self):
         """
@@ -41,36 +213,24 @@ class LauncherConfigManager:
         此方法也负责将内置的“系统默认播放器”工具注入到配置中，
         并兼容旧版本的工具类型。
         """
-        # 定义内置的“用系统默认播放器打开”工具的配置
-        SYSTEM_DEFAULT_PLAYER_TOOL = {
-            "id": "system_default_player",
-            "type": "simple_open", # 这是一个“简单文件打开”类型的工具
-            "name": "用系统默认播放器打开",
-            "path": "system_handler", # 特殊标识符，实际由插件内部处理，不指向真实路径
-            "supported_formats": ".wav, .mp3, .flac, .aiff, .ogg, .m4a", # 支持的音频格式
-            "enabled": True
-        }
+        # 只 stat 一次：既判断文件是否存在，也用于校验缓存
+        try:
+            st = os.stat(self.config_path)
+        except OSError:
+            st = None
+        if st is not None:
+            cached = self._load_cache.get(self.config_path)
+            if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+                # 返回副本，调用方对配置的修改不会影响缓存
+                return copy.deepcopy(cached[2])
 
-        # 定义一个默认的Praat工具示例（高级程序启动类型）
-        DEFAULT_PRAAT_TOOL = {
-            "id": str(uuid.uuid4()),
-            "type": "advanced", # 原来的“简单程序启动”现在是“高级”
-            "name": "用 Praat 打开",
-            "path": "", # 用户需自行配置Praat路径
-            "supported_formats": ".wav, .mp3, .flac, .aiff, .ogg",
-            "command_template": '"{tool_path}" --open {filepaths_quoted}', # 典型的Praat打开命令
-            "enabled": True
-        }
-        
-        # 初始默认配置，包含Praat示例
-        default_settings = {"tools": [DEFAULT_PRAAT_TOOL]}
-        
         # 尝试从文件加载现有配置
-        config_to_use = default_settings
-        if os.path.exists(self.config_path):
+        config_to_use = None
+        if st is not None:
             try:
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    loaded_config = json.load(f)
+                # 以二进制一次读入，交给解析器直接处理 UTF-8 字节
+                with open(self.config_path, 'rb') as f:
+                    loaded_config = parse_config(f.read())
                     # 验证加载的配置结构是否有效
                     if isinstance(loaded_config.get('tools'), list):
                         config_to_use = loaded_config
@@ -78,6 +238,9 @@ class LauncherConfigManager:
                         print("[LauncherConfig] config.json中'tools'结构无效，将使用默认设置。")
             except (json.JSONDecodeError, IOError) as e:
                 print(f"[LauncherConfig] 加载config.json时出错: {e}。将使用默认设置。")
+        if config_to_use is None:
+            # 初始默认配置，包含Praat示例（仅在需要时从模板复制，并分配新的ID）
+            config_to_use = {"tools": [dict(DEFAULT_PRAAT_TOOL, id=str(uuid.uuid4()))]}
         
         # 核心逻辑：确保“系统默认播放器”工具始终存在于列表中
         tools_list = config_to_use.get("tools", [])
@@ -88,12 +251,12 @@ class LauncherConfigManager:
                 # [兼容性修复] 确保内置工具的类型和路径标识符正确（防止旧版本配置错误）
                 if tool.get('type') != SYSTEM_DEFAULT_PLAYER_TOOL['type'] or \
                    tool.get('path') != SYSTEM_DEFAULT_PLAYER_TOOL['path']:
-                    tools_list[i] = SYSTEM_DEFAULT_PLAYER_TOOL # 强制更新
+                    tools_list[i] = dict(SYSTEM_DEFAULT_PLAYER_TOOL) # 强制更新（注入可修改的副本）
                 break
         
         # 如果列表中没有“系统默认播放器”工具，则将其添加到列表的开头
         if not has_default_player:
-            tools_list.insert(0, SYSTEM_DEFAULT_PLAYER_TOOL)
+            tools_list.insert(0, dict(SYSTEM_DEFAULT_PLAYER_TOOL))
         
         # [旧版本兼容性处理] 将旧的 'praat_script' 类型工具转换为 'advanced'
         # 并为其提供一个默认的命令模板，以免用户重新配置
@@ -105,47 +268,108 @@ class LauncherConfigManager:
                 print(f"[LauncherConfig] 将旧的Praat脚本工具'{tool.get('name')}'转换为高级程序启动工具。")
 
         config_to_use['tools'] = tools_list
+        if st is not None:
+            self._load_cache[self.config_path] = (st.st_mtime_ns, st.st_size, copy.deepcopy(config_to_use))
         return config_to_use
 
     def save(self):
-        """将当前配置设置保存到 `config.json` 文件中。"""
+        """
+        将当前配置设置保存到 `config.json` 文件中。
+        先完整写入临时文件并落盘，再用 os.replace 原子替换，写入中途崩溃也不会留下被截断的配置文件。
+        整个文档先在内存中序列化为字节串再一次写出（json.dump 会对每个片段各调用一次 write）。
+        """
+        self._save_pending = False
+        tmp_path = self.config_path + ".tmp"
         try:
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                # `ensure_ascii=False` 确保中文字符正确写入
-                json.dump(self.settings, f, indent=4, ensure_ascii=False)
-        except IOError as e:
+            payload = serialize_config(self.settings)
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_path)
+            # 用新文件的状态更新缓存，下次加载时直接命中
+            st = os.stat(self.config_path)
+            self._load_cache[self.config_path] = (st.st_mtime_ns, st.st_size, copy.deepcopy(self.settings))
+        except (IOError, OSError) as e:
             print(f"无法保存启动器插件配置文件: {e}")
 
+    def schedule_save(self):
+        """
+        延迟保存：在 SAVE_DEBOUNCE_MS 内的多次修改只触发一次写盘。
+        需要立即落盘时（如插件卸载、对话框关闭）调用 flush()。
+        """
+        if self._save_pending: return
+        self._save_pending = True
+        QTimer.singleShot(self.SAVE_DEBOUNCE_MS, self.flush)
+
+    def flush(self):
+        """如果有尚未执行的延迟保存，立即写盘。"""
+        if self._save_pending:
+            self.save()
+
     def get_tools(self):
         """返回所有已配置的工具列表。"""
         return self.settings.get("tools", [])
 
+    def get_enabled_tools(self):
+        """
+        返回已启用的工具列表。结果被缓存，直到工具被更新或移除；
+        右键菜单每次弹出时只需遍历真正可能出现的工具。
+        """
+        if self._enabled_cache is None:
+            self._enabled_cache = [tool for tool in self.get_tools() if tool.get('enabled')]
+        return self._enabled_cache
+
     def get_tool_by_id(self, tool_id):
         """根据ID查找并返回一个工具的配置数据。"""
-        for tool in self.get_tools():
-            if tool.get('id') == tool_id:
-                return tool
-        return None
+        i = self._index.get(tool_id)
+        return self.settings['tools'][i] if i is not None else None
 
     def update_tool(self, tool_data):
-        """更新或添加一个工具的配置数据，并保存到文件。"""
-        for i, tool in enumerate(self.get_tools()):
-            if tool.get('id') == tool_data.get('id'):
-                self.settings['tools'][i] = tool_data
-                self.save()
-                return
-        # 如果未找到，则作为新工具添加
-        self.settings['tools'].append(tool_data)
-        self.save()
+        """更新或添加一个工具的配置数据，并（延迟）保存到文件。"""
+        tool_id = tool_data.get('id')
+        i = self._index.get(tool_id)
+        self._ext_sets[tool_id] = self._compute_ext_set(tool_data)
+        self._enabled_cache = None
+        if i is not None:
+            self.settings['tools'][i] = tool_data
+        else:
+            # 如果未找到，则作为新工具添加
+            self._index[tool_id] = len(self.settings['tools'])
+            self.settings['tools'].append(tool_data)
+        self.schedule_save()
 
     def remove_tool(self, tool_id):
-        """根据ID移除一个工具的配置数据，并保存到文件。"""
-        self.settings['tools'] = [t for t in self.get_tools() if t.get('id') != tool_id]
-        self.save()
+        """
+        根据ID移除一个工具的配置数据，并（延迟）保存到文件。
+        通过索引找到位置后原地删除，只需把其后工具的下标各减一，不再复制整个列表或重建全部索引。
+        """
+        i = self._index.pop(tool_id, None)
+        if i is None: return
+        del self.settings['tools'][i]
+        for other_id, j in self._index.items():
+            if j > i: self._index[other_id] = j - 1
+        self._ext_sets.pop(tool_id, None)
+        self._enabled_cache = None
+        self.schedule_save()
 
 # ==============================================================================
 # 2. LauncherSettingsDialog - 插件设置对话框
 # ==============================================================================
+# 设置对话框中命令模板变量的帮助文本
+HELP_HTML = """
+<h4>命令模板变量说明 (仅限“高级程序启动”):</h4>
+<ul>
+    <li><code>{tool_path}</code> - 替换为上方设置的程序路径。</li>
+    <li><code>{filepaths}</code> - 替换为所有选中文件的路径，用空格分隔。</li>
+    <li><code>{filepaths_quoted}</code> - <b>(推荐)</b> 替换为所有选中文件的路径，每个路径都用双引号包裹。</li>
+    <li><code>{filepath}</code> - 替换为<b>第一个</b>选中文件的路径。</li>
+    <li><code>{filepath_quoted}</code> - <b>(推荐)</b> 替换为<b>第一个</b>选中文件的路径，并用双引号包裹。</li>
+</ul>
+<p><b>示例 (Audacity):</b> <code>"{tool_path}" {filepaths_quoted}</code></p>
+<p><b>示例 (Praat):</b> <code>"{tool_path}" --open {filepaths_quoted}</code></p>
+"""
+
 class LauncherSettingsDialog(QDialog):
     """
     用于管理所有外部工具的UI窗口。
@@ -164,6 +388,16 @@ class LauncherSettingsDialog(QDialog):
         self._connect_signals() # 连接UI信号
         self.populate_tool_list() # 填充工具列表
 
+    def showEvent(self, event):
+        """
+        对话框第一次显示时才填充帮助文本：setHtml 需要把 HTML 解析为文档模型，
+        放在这里可以把这部分开销移出对话框的构造过程。
+        """
+        if not self._help_loaded:
+            self.help_text.setHtml(HELP_HTML)
+            self._help_loaded = True
+        super().showEvent(event)
+
     def _init_ui(self):
         """构建对话框的用户界面布局。"""
         main_layout = QVBoxLayout(self)
@@ -214,7 +448,14 @@ class LauncherSettingsDialog(QDialog):
         self.tool_command_edit = QLineEdit()
         self.tool_command_edit.setPlaceholderText('例如: "{tool_path}" --open {filepaths_quoted}')
 
+        # 表单顶部的内联错误提示（默认隐藏），保存时的验证错误集中显示在这里，而不是逐条弹出模态对话框
+        self.error_label = QLabel()
+        self.error_label.setStyleSheet("color: #b00;")
+        self.error_label.setWordWrap(True)
+        self.error_label.setVisible(False)
+
         # 将所有编辑控件添加到表单布局
+        self.right_layout.addRow(self.error_label)
         self.right_layout.addRow(self.tool_enabled_check)
         self.right_layout.addRow("工具类型:", self.tool_type_combo)
         self.right_layout.addRow("工具名称:", self.tool_name_edit)
@@ -222,23 +463,12 @@ class LauncherSettingsDialog(QDialog):
         self.right_layout.addRow("支持的格式:", self.tool_formats_edit)
         self.right_layout.addRow(self.command_label, self.tool_command_edit)
 
-        # 帮助文本区域
-        help_text = QTextEdit()
-        help_text.setReadOnly(True)
-        help_text.setHtml("""
-        <h4>命令模板变量说明 (仅限“高级程序启动”):</h4>
-        <ul>
-            <li><code>{tool_path}</code> - 替换为上方设置的程序路径。</li>
-            <li><code>{filepaths}</code> - 替换为所有选中文件的路径，用空格分隔。</li>
-            <li><code>{filepaths_quoted}</code> - <b>(推荐)</b> 替换为所有选中文件的路径，每个路径都用双引号包裹。</li>
-            <li><code>{filepath}</code> - 替换为<b>第一个</b>选中文件的路径。</li>
-            <li><code>{filepath_quoted}</code> - <b>(推荐)</b> 替换为<b>第一个</b>选中文件的路径，并用双引号包裹。</li>
-        </ul>
-        <p><b>示例 (Audacity):</b> <code>"{tool_path}" {filepaths_quoted}</code></p>
-        <p><b>示例 (Praat):</b> <code>"{tool_path}" --open {filepaths_quoted}</code></p>
-        """)
-        help_text.setFixedHeight(180) # 固定帮助文本区域高度
-        self.right_layout.addRow(help_text)
+        # 帮助文本区域（HTML 内容推迟到对话框第一次显示时再解析，见 showEvent）
+        self.help_text = QTextEdit()
+        self.help_text.setReadOnly(True)
+        self.help_text.setFixedHeight(180) # 固定帮助文本区域高度
+        self.right_layout.addRow(self.help_text)
+        self._help_loaded = False
         
         # 将左右面板添加到分割器中
         splitter.addWidget(left_widget)
@@ -270,25 +500,39 @@ class LauncherSettingsDialog(QDialog):
     def populate_tool_list(self):
         """从配置管理器加载工具列表，并填充到左侧QListWidget中。"""
         # 记录当前选中项的ID，以便刷新后恢复选中
-        current_id = self.tool_list.currentItem().data(Qt.UserRole) if self.tool_list.currentItem() else None
-        self.tool_list.clear() # 清空列表
-        
-        for tool in self.config_manager.get_tools():
+        current_item = self.tool_list.currentItem() # 只查询一次当前项
+        current_id = current_item.data(Qt.UserRole) if current_item else None
+        # 批量重建期间暂停重绘，整个列表只在结束时重绘一次
+        self.tool_list.setUpdatesEnabled(False)
+        self.tool_list.clear() # 清空列表（此时仍发出选中变化信号，使右侧表单与空列表保持一致）
+
+        # 两种状态图标各只向图标管理器请求一次，所有行共用
+        enabled_icon = self.icon_manager.get_icon("success")
+        disabled_icon = self.icon_manager.get_icon("error")
+        # 逐项插入期间屏蔽控件信号，选中状态在全部插入后统一恢复
+        self.tool_list.blockSignals(True)
+        self._id_to_row = {} # 工具ID -> 行号，用于恢复选中项
+        for row, tool in enumerate(self.config_manager.get_tools()):
+            self._id_to_row[tool.get('id')] = row
             item = QListWidgetItem(tool.get('name', '未命名工具'))
             item.setData(Qt.UserRole, tool.get('id')) # 存储工具ID
             # 根据工具的启用状态设置图标
-            item.setIcon(self.icon_manager.get_icon("success") if tool.get('enabled') else self.icon_manager.get_icon("error"))
+            item.setIcon(enabled_icon if tool.get('enabled') else disabled_icon)
             self.tool_list.addItem(item)
+        self.tool_list.blockSignals(False)
+        self.tool_list.setUpdatesEnabled(True)
         
-        # 尝试恢复之前的选中状态，或默认选中第一个
-        if current_id:
-            items = self.tool_list.findItems(current_id, Qt.MatchExactly)
-            if items: self.tool_list.setCurrentItem(items[0])
+        # 尝试恢复之前的选中状态，或默认选中第一个。
+        # 按 UserRole 中的ID查行号（findItems 只匹配显示文本，无法按ID找到列表项）
+        row = self._id_to_row.get(current_id) if current_id else None
+        if row is not None:
+            self.tool_list.setCurrentRow(row)
         elif self.tool_list.count() > 0:
             self.tool_list.setCurrentRow(0) # 默认选中第一行
 
     def on_tool_selected(self, current, previous):
         """当用户在工具列表中选择不同工具时，更新右侧编辑表单的内容。"""
+        self.show_errors([]) # 切换工具时清除上一个工具的验证错误
         if not current:
             # 如果没有选中任何项（例如列表被清空），则清空并禁用表单
             self.clear_form()
@@ -395,9 +639,8 @@ class LauncherSettingsDialog(QDialog):
         当用户在“工具类型”下拉框中选择不同类型时，动态更新UI。
         根据选择的类型，显示或隐藏命令模板和支持格式等字段。
         """
-        tool_type_text = self.tool_type_combo.currentText()
-        is_simple_open = (tool_type_text == "简单文件打开")
-        is_advanced = (tool_type_text == "高级程序启动")
+        # 直接使用信号传入的下标判断类型（0: 简单文件打开, 1: 高级程序启动），无需再向下拉框查询当前文本
+        is_advanced = (index == 1)
         
         # --- 更新标签文本 ---
         self.path_label.setText("程序路径:")
@@ -450,11 +693,19 @@ class LauncherSettingsDialog(QDialog):
             self.tool_enabled_check.setEnabled(True)
             self.save_btn.setEnabled(True) # 系统工具的保存按钮只控制名称和启用状态
 
+    def show_errors(self, errors):
+        """
+        在表单顶部的内联提示中显示验证错误；errors 为空时隐藏提示。
+        :param errors: 错误信息字符串列表。
+        """
+        self.error_label.setText("\n".join(errors))
+        self.error_label.setVisible(bool(errors))
+
     def on_save(self):
         """处理“保存当前工具”按钮的点击事件，将表单数据保存到配置。"""
         tool_id = self.tool_id_label.text()
         if not tool_id:
-            QMessageBox.warning(self, "无法保存", "没有要保存的工具。请先'添加新工具'或从左侧选择一个。")
+            self.show_errors(["没有要保存的工具。请先'添加新工具'或从左侧选择一个。"])
             return
 
         tool_type_text = self.tool_type_combo.currentText()
@@ -471,20 +722,29 @@ class LauncherSettingsDialog(QDialog):
             "command_template": self.tool_command_edit.text()
         }
 
-        # 字段验证
+        # 字段验证：一次收集所有问题，统一显示在内联错误提示中
+        errors = []
         if not tool_data['name']:
-            QMessageBox.warning(self, "信息不完整", "工具名称不能为空。")
-            return
+            errors.append("工具名称不能为空。")
 
         # 如果不是系统默认播放器工具，则程序路径是必填项
         if tool_id != 'system_default_player' and not tool_data['path']:
-            QMessageBox.warning(self, "信息不完整", "程序路径不能为空。")
-            return
+            errors.append("程序路径不能为空。")
         
         # 针对“高级程序启动”类型，命令模板是必填项
         if type_key == "advanced" and not tool_data['command_template']:
-            QMessageBox.warning(self, "信息不完整", "高级程序启动需要填写命令模板。")
-            return
+            errors.append("高级程序启动需要填写命令模板。")
+
+        # POSIX 上命令不经过 shell 执行，模板在保存时即按 shell 规则拆分一次：
+        # 引号不匹配的错误在编辑时就能发现，拆分结果也进入缓存，首次启动时无需再解析
+        elif type_key == "advanced" and sys.platform != 'win32':
+            try:
+                compile_command_argv(tool_data['command_template'])
+            except ValueError as e:
+                errors.append(f"无法解析命令模板（请检查引号是否成对）: {e}")
+
+        self.show_errors(errors)
+        if errors: return
         
         # 对于“简单文件打开”类型，命令模板由插件内部生成，清空用户可能输入的无效内容
         if type_key == "simple_open":
@@ -536,6 +796,7 @@ class ExternalToolLauncherPlugin(BasePlugin):
         self.hooked_modules.clear()
         if self.settings_dialog:
             self.settings_dialog.close() # 关闭对话框
+        self.config_manager.flush() # 确保尚未写盘的修改被保存
 
     def execute(self, **kwargs):
         """
@@ -544,8 +805,9 @@ class ExternalToolLauncherPlugin(BasePlugin):
         """
         if self.settings_dialog is None:
             self.settings_dialog = LauncherSettingsDialog(self.config_manager, self.main_window.icon_manager, self.main_window)
-            # 当对话框关闭时，清除对它的引用
+            # 当对话框关闭时，清除对它的引用，并立即写入尚未落盘的修改
             self.settings_dialog.finished.connect(lambda: setattr(self, 'settings_dialog', None))
+            self.settings_dialog.finished.connect(self.config_manager.flush)
         
         self.settings_dialog.show()
         self.settings_dialog.raise_() # 将窗口置于顶层
@@ -560,40 +822,38 @@ class ExternalToolLauncherPlugin(BasePlugin):
         """
         if not filepaths: return # 没有文件选中则不填充
 
+        # 选中文件的扩展名集合在循环外只计算一次，供所有工具共用；
+        # 并且推迟到第一个需要比较格式的工具时才计算（只有“支持所有类型”的工具时无需遍历所选文件）
+        selected_exts = None
+
+        # 先筛选出可用的工具，再决定是否需要创建子菜单
+        candidates = []
+        for tool in self.config_manager.get_enabled_tools(): # 只遍历已启用的工具
+            # 使用预先计算的扩展名集合：None 表示支持所有文件类型（“简单文件打开”且格式为 ".*"）；
+            # 否则只要有一个文件匹配（两个集合有交集），就认为该工具可用
+            supported_exts = self.config_manager.get_supported_exts(tool)
+            if supported_exts is None:
+                candidates.append(tool)
+                continue
+            if selected_exts is None: selected_exts = frozenset(map(file_extension, filepaths))
+            if not supported_exts.isdisjoint(selected_exts):
+                candidates.append(tool)
+
+        # 没有任何可用工具时直接返回，不创建用不到的 QMenu 和图标
+        if not candidates: return
+
         # 创建一个子菜单，避免主菜单过于拥挤
         launcher_menu = QMenu("用外部工具打开", menu)
         launcher_menu.setIcon(self.main_window.icon_manager.get_icon("export")) # 设置子菜单图标
-        
-        actions_added = 0
-        for tool in self.config_manager.get_tools():
-            if not tool.get('enabled'): continue # 跳过未启用的工具
+        for tool in candidates:
+            action = QAction(tool.get('name'), launcher_menu)
+            # 使用 functools.partial 将 tool_id 和 filepaths 作为参数传递给 launch_tool
+            action.triggered.connect(partial(self.launch_tool, tool.get('id'), filepaths))
+            launcher_menu.addAction(action)
 
-            supported_formats_str = tool.get('supported_formats', '')
-            # 对于“简单文件打开”类型且支持所有格式的工具，或者系统默认播放器，
-            # 视为支持所有文件类型。
-            if tool.get('type') == 'simple_open' and supported_formats_str == ".*":
-                is_supported = True
-            else:
-                # 否则，检查选中的文件格式是否与工具支持的格式匹配
-                supported_formats = [f.strip().lower() for f in supported_formats_str.split(',') if f.strip()]
-                is_supported = False
-                for f_path in filepaths:
-                    ext = os.path.splitext(f_path)[1].lower()
-                    if ext in supported_formats:
-                        is_supported = True
-                        break # 只要有一个文件匹配，就认为该工具可用
-            
-            if is_supported:
-                action = QAction(tool.get('name'), launcher_menu)
-                # 使用 functools.partial 将 tool_id 和 filepaths 作为参数传递给 launch_tool
-                action.triggered.connect(partial(self.launch_tool, tool.get('id'), filepaths))
-                launcher_menu.addAction(action)
-                actions_added += 1
-        
-        # 如果有任何工具被添加到子菜单，则将子菜单添加到主菜单
-        if actions_added > 0:
-            menu.addSeparator()
-            menu.addMenu(launcher_menu)
+        # 将子菜单添加到主菜单
+        menu.addSeparator()
+        menu.addMenu(launcher_menu)
 
     def launch_tool(self, tool_id, filepaths):
         """
@@ -604,7 +864,8 @@ class ExternalToolLauncherPlugin(BasePlugin):
         # --- 系统默认播放器逻辑 (保持不变) ---
         if tool_id == 'system_default_player':
             if filepaths:
-                self._launch_with_system_default(filepaths[0])
+                # 路径来自当前的右键菜单选区，无需再检查是否存在
+                self._launch_with_system_default(filepaths[0], verify_exists=False)
             return
 
         # --- 工具数据获取 (保持不变) ---
@@ -620,8 +881,7 @@ class ExternalToolLauncherPlugin(BasePlugin):
         if tool_path != "system_handler" and (not tool_path or not os.path.exists(tool_path)):
             QMessageBox.critical(self.main_window, "路径错误", f"工具 '{tool['name']}' 的路径无效或不存在:\n{tool_path}")
             return
-            
-        filepaths_quoted_str = " ".join([f'"{f}"' for f in filepaths])
+
 
         # --- 根据工具类型构建命令 ---
         if tool_type == "simple_open":
@@ -640,38 +900,41 @@ class ExternalToolLauncherPlugin(BasePlugin):
                  QMessageBox.critical(self.main_window, "命令模板缺失", f"工具 '{tool['name']}' 未配置命令模板。")
                  return
             
-            # [核心修复] 直接替换占位符，不添加额外的引号
-            # ----------------------------------------------------
-            final_command_str = command_template.replace("{tool_path}", tool_path)
-            # ----------------------------------------------------
-            
-            final_command_str = final_command_str.replace("{filepaths_quoted}", filepaths_quoted_str)
-            final_command_str = final_command_str.replace("{filepaths}", " ".join(filepaths))
-            
-            if filepaths:
-                final_command_str = final_command_str.replace("{filepath_quoted}", f'"{filepaths[0]}"')
-                final_command_str = final_command_str.replace("{filepath}", filepaths[0])
-            else:
-                final_command_str = final_command_str.replace("{filepath_quoted}", "")
-                final_command_str = final_command_str.replace("{filepath}", "")
-
-            print(f"[Launcher Plugin] 执行命令: {final_command_str}")
+            # [核心修复] 直接替换占位符，不添加额外的引号；各占位符的取值只在模板实际引用时才计算
+            # 同一次启动中，模板多次引用同一占位符时只计算一次
+            resolve = lru_cache(maxsize=None)(partial(resolve_placeholder, tool_path=tool_path, filepaths=filepaths))
+            final_command_str = command_template
             try:
-                subprocess.Popen(final_command_str, shell=True)
+                # 不经过 shell：直接 exec 目标程序，进程树中不再多出一个 /bin/sh 或 cmd.exe
+                if sys.platform == 'win32':
+                    # Windows 上 CreateProcess 本身按命令行字符串解析参数，使用预编译的模板片段一次性拼接出最终命令即可
+                    final_command_str = "".join(map(resolve, compile_command_template(command_template)))
+                    print(f"[Launcher Plugin] 执行命令: {final_command_str}")
+                    subprocess.Popen(final_command_str, shell=False, creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+                else:
+                    # POSIX 上先按模板拆分参数再替换，并放入新会话，使外部程序与主程序脱离
+                    argv = build_command_argv(command_template, resolve, filepaths)
+                    final_command_str = shlex.join(argv)
+                    print(f"[Launcher Plugin] 执行命令: {final_command_str}")
+                    subprocess.Popen(argv, shell=False, close_fds=True, start_new_session=True)
             except Exception as e:
                 QMessageBox.critical(self.main_window, "启动失败", f"无法执行命令: \n{final_command_str}\n\n错误: {e}")
             
         else: # 未知工具类型
             QMessageBox.warning(self.main_window, "未知工具类型", f"工具 '{tool['name']}' 配置了未知类型: {tool_type}")
 
-    def _launch_with_system_default(self, filepath):
+    def _launch_with_system_default(self, filepath, *, verify_exists=False):
         """
         使用操作系统关联的默认程序打开文件。
         根据操作系统调用不同的命令。
         :param filepath: 要打开的文件路径。
+        :param verify_exists: 是否在所有平台上都先检查文件是否存在。来自右键菜单选区的路径刚刚才被选中，
+                              在 Windows 上默认不再 stat：文件若已消失，os.startfile 会同步抛出异常并由下方的异常处理提示。
+                              macOS/Linux 上 open/xdg-open 以子进程异步启动，找不到文件时不会抛出异常，因此始终检查。
+                              路径来源不可信的调用方应传入 True。
         """
         try:
-            if not os.path.exists(filepath):
+            if (verify_exists or sys.platform != "win32") and not os.path.exists(filepath):
                 QMessageBox.warning(self.main_window, "文件不存在", f"无法找到文件:\n{filepath}")
                 return
             
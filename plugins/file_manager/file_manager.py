@@ -9,6 +9,7 @@ import pathlib
 from datetime import datetime, timedelta
 import subprocess
 import uuid
+from functools import partial
 # PyQt5 核心模块导入
 from PyQt5.QtWidgets import (QDialog, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QTreeWidget, QTreeWidgetItem, QTableWidget, QTableWidgetItem,
@@ -23,6 +24,24 @@ try:
     AUDIO_LIBS_AVAILABLE = True
 except ImportError:
     AUDIO_LIBS_AVAILABLE = False
+# 可选依赖：orjson 的解析和序列化比标准库 json 快数倍，用于回收站策略文件的读写
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 回收站策略的标准库编码器在模块加载时构造一次。json.dumps 只有在使用默认参数时才复用内置编码器，
+# 带 indent 参数的每次调用都会新建一个 JSONEncoder；预先构造后，首次保存也不再承担这部分开销。
+# （json.loads 不带参数时本就复用模块级的默认解码器，无需额外预热。）
+# 缩进与 orjson.OPT_INDENT_2 相同且不转义非 ASCII 字符：无论是否安装 orjson，写出的策略文件格式都一致。
+_POLICY_JSON_ENCODER = json.JSONEncoder(indent=2, ensure_ascii=False)
+
+def encode_policy(policy):
+    """将回收站策略序列化为 UTF-8 字节（优先使用 orjson），所有写入策略文件的位置共用此函数。"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(policy, option=orjson.OPT_INDENT_2)
+    return _POLICY_JSON_ENCODER.encode(policy).encode('utf-8')
 
 # --- 项目路径发现 ---
 # 插件必须是自给自足的，它自己计算项目根目录。
@@ -81,6 +100,11 @@ class TrashPolicyDialog(QDialog):
     提供一个可视化界面，允许用户配置回收站的自动清理策略。
     策略包括：按文件保留天数、按文件数量上限、按回收站总体积上限。
     """
+    # 已解析策略的缓存：policy_path -> (st_mtime_ns, 与默认值合并后的策略字典)。
+    # 策略文件在一次会话中很少变化，文件未被修改时再次打开对话框无需重新读取和解析；
+    # 每个路径只保留最新的一项，文件被修改后旧条目直接被覆盖。
+    _policy_cache = {}
+
     def __init__(self, policy_path, parent=None):
         """
         初始化回收站策略配置对话框。
@@ -108,63 +132,19 @@ class TrashPolicyDialog(QDialog):
         self.policy_group = QGroupBox("清理规则 (按以下顺序执行)")
         form_layout = QFormLayout(self.policy_group)
 
-        # 辅助函数：用于创建单个策略配置行（包含复选框、滑块和数值标签）
-        def create_policy_row(key, label_text, tooltip_text, min_val, max_val, suffix):
-            """
-            创建一个包含复选框、滑块和数值标签的策略配置行。
-            :param key: 策略设置在字典中的键名后缀 (e.g., "days", "count", "size_mb")。
-            :param label_text: 复选框显示的文本。
-            :param tooltip_text: 复选框的工具提示文本。
-            :param min_val: 滑块的最小值。
-            :param max_val: 滑块的最大值。
-            :param suffix: 数值标签的单位后缀 (e.g., "天", "个", "MB")。
-            :return: 返回 (复选框实例, 滑块实例)。
-            """
-            checkbox = QCheckBox(label_text)
-            # 从设置中读取该策略是否启用，默认启用
-            checkbox.setChecked(self.settings.get(f"by_{key}_enabled", True))
-            checkbox.setToolTip(tooltip_text) # 设置工具提示
-            
-            slider = QSlider(Qt.Horizontal)
-            slider.setRange(min_val, max_val)
-            # 从设置中读取滑块的当前值，默认值根据策略类型而定
-            slider.setValue(self.settings.get(f"max_{key}", 30)) 
-            
-            value_label = QLabel() # 显示滑块当前值的标签
-            
-            # 连接滑块的 valueChanged 信号，实时更新数值标签
-            def update_label(val):
-                value_label.setText(f"{val} {suffix}")
-            slider.valueChanged.connect(update_label)
-            update_label(slider.value()) # 初始化时更新一次标签显示
-            
-            # 连接复选框的 toggled 信号，控制滑块和数值标签的启用/禁用状态
-            checkbox.toggled.connect(slider.setEnabled)
-            checkbox.toggled.connect(value_label.setEnabled)
-            # 根据复选框的初始状态设置滑块和标签的启用状态
-            slider.setEnabled(checkbox.isChecked())
-            value_label.setEnabled(checkbox.isChecked())
-            
-            h_layout = QHBoxLayout() # 水平布局，放置滑块和数值标签
-            h_layout.addWidget(slider)
-            h_layout.addWidget(value_label)
-            
-            form_layout.addRow(checkbox, h_layout) # 将复选框和水平布局添加到表单布局中
-            return checkbox, slider
-
         # --- 创建三个策略配置行实例 ---
-        self.days_check, self.days_slider = create_policy_row(
-            "days", "按时间清理:",
+        self.days_check, self.days_slider = self._create_policy_row(
+            form_layout, "days", "按时间清理:",
             "勾选后，将自动删除在回收站中存放超过指定天数的文件。",
             1, 90, "天" # 1到90天
         )
-        self.count_check, self.count_slider = create_policy_row(
-            "count", "按数量清理:",
+        self.count_check, self.count_slider = self._create_policy_row(
+            form_layout, "count", "按数量清理:",
             "勾选后，当文件总数超过指定数量时，将从最旧的文件开始删除，直到满足数量限制。",
             50, 2000, "个" # 50到2000个文件
         )
-        self.size_check, self.size_slider = create_policy_row(
-            "size_mb", "按体积清理:",
+        self.size_check, self.size_slider = self._create_policy_row(
+            form_layout, "size_mb", "按体积清理:",
             "勾选后，当回收站总体积超过指定大小时，将从最旧的文件开始删除，直到满足体积限制。",
             100, 5120, "MB" # 100MB到5GB
         )
@@ -181,6 +161,64 @@ class TrashPolicyDialog(QDialog):
         button_box.rejected.connect(self.reject) # 连接取消信号
         layout.addWidget(button_box) # 添加按钮盒
 
+    def _create_policy_row(self, form_layout, key, label_text, tooltip_text, min_val, max_val, suffix):
+        """
+        创建一个包含复选框、滑块和数值标签的策略配置行，并添加到表单布局中。
+        :param form_layout: 要添加该行的 QFormLayout。
+        :param key: 策略设置在字典中的键名后缀 (e.g., "days", "count", "size_mb")。
+        :param label_text: 复选框显示的文本。
+        :param tooltip_text: 复选框的工具提示文本。
+        :param min_val: 滑块的最小值。
+        :param max_val: 滑块的最大值。
+        :param suffix: 数值标签的单位后缀 (e.g., "天", "个", "MB")。
+        :return: 返回 (复选框实例, 滑块实例)。
+        """
+        checkbox = QCheckBox(label_text)
+        # 从设置中读取该策略是否启用，默认启用
+        checkbox.setChecked(self.settings.get(f"by_{key}_enabled", True))
+        checkbox.setToolTip(tooltip_text) # 设置工具提示
+        
+        slider = QSlider(Qt.Horizontal)
+        slider.setRange(min_val, max_val)
+        # 从设置中读取滑块的当前值，默认值根据策略类型而定
+        slider.setValue(self.settings.get(f"max_{key}", 30)) 
+        
+        value_label = QLabel() # 显示滑块当前值的标签
+        
+        # 数值标签的更新经由单次定时器合并：拖动滑块时每个整数刻度都会触发 valueChanged，
+        # 这里最多每 16 ms（约一帧）刷新一次标签，显示的总是滑块的最新值
+        update_label = partial(self._update_value_label, slider, value_label, suffix)
+        label_timer = QTimer(value_label)
+        label_timer.setSingleShot(True)
+        label_timer.setInterval(16)
+        label_timer.timeout.connect(update_label)
+        slider.valueChanged.connect(partial(self._schedule_label_update, label_timer))
+        update_label() # 初始化时更新一次标签显示
+        
+        # 连接复选框的 toggled 信号，控制滑块和数值标签的启用/禁用状态
+        checkbox.toggled.connect(slider.setEnabled)
+        checkbox.toggled.connect(value_label.setEnabled)
+        # 根据复选框的初始状态设置滑块和标签的启用状态
+        slider.setEnabled(checkbox.isChecked())
+        value_label.setEnabled(checkbox.isChecked())
+        
+        h_layout = QHBoxLayout() # 水平布局，放置滑块和数值标签
+        h_layout.addWidget(slider)
+        h_layout.addWidget(value_label)
+        
+        form_layout.addRow(checkbox, h_layout) # 将复选框和水平布局添加到表单布局中
+        return checkbox, slider
+
+    @staticmethod
+    def _schedule_label_update(label_timer, _value):
+        """滑块值变化时启动标签刷新定时器；已在等待中则不重复启动。"""
+        if not label_timer.isActive(): label_timer.start()
+
+    @staticmethod
+    def _update_value_label(slider, value_label, suffix):
+        """用滑块的当前值刷新数值标签。"""
+        value_label.setText(f"{slider.value()} {suffix}")
+
     def _load_policy(self):
         """
         从 JSON 配置文件中加载回收站清理策略。
@@ -193,16 +231,25 @@ class TrashPolicyDialog(QDialog):
             "by_count_enabled": True, "max_count": 500,
             "by_size_mb_enabled": True, "max_size_mb": 1024
         }
-        if not os.path.exists(self.policy_path):
+        # 只 stat 一次：既判断文件是否存在，也用于校验缓存是否仍然有效
+        try:
+            mtime_ns = os.stat(self.policy_path).st_mtime_ns
+        except OSError:
             return defaults
+        cached = self._policy_cache.get(self.policy_path)
+        if cached is not None and cached[0] == mtime_ns:
+            return dict(cached[1]) # 返回副本，on_save 对 self.settings 的修改不会影响缓存
         try:
-            with open(self.policy_path, 'r', encoding='utf-8') as f:
-                settings = json.load(f)
-                defaults.update(settings) # 用从文件加载的设置覆盖默认值
-                return defaults
+            # 以二进制一次读入，交给解析器直接处理 UTF-8 字节（orjson 的解析错误是 json.JSONDecodeError 的子类）
+            with open(self.policy_path, 'rb') as f:
+                raw = f.read()
+            settings = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+            defaults.update(settings) # 用从文件加载的设置覆盖默认值
         except (json.JSONDecodeError, IOError):
             # 如果文件损坏或无法读取，回退到默认策略
             return defaults
+        self._policy_cache[self.policy_path] = (mtime_ns, dict(defaults))
+        return defaults
 
     def on_save(self):
         """
@@ -218,9 +265,12 @@ class TrashPolicyDialog(QDialog):
         self.settings["max_size_mb"] = self.size_slider.value()
         
         try:
-            # 将设置保存到 JSON 文件
-            with open(self.policy_path, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=4)
+            # 将设置保存到 JSON 文件：先在内存中序列化，再一次写出（json.dump 会对每个片段各调用一次 write）
+            payload = encode_policy(self.settings)
+            with open(self.policy_path, 'wb') as f:
+                f.write(payload)
+            # 以新文件的修改时间更新缓存，下次打开对话框时直接命中
+            self._policy_cache[self.policy_path] = (os.stat(self.policy_path).st_mtime_ns, dict(self.settings))
             QMessageBox.information(self, "成功", "回收站策略已保存。")
             self.accept() # 关闭对话框
         except Exception as e:
@@ -2317,8 +2367,8 @@ class FileManagerDialog(QDialog):
         将回收站清理策略保存到 JSON 配置文件中。
         """
         try:
-            with open(self.trash_policy_config_path, 'w', encoding='utf-8') as f:
-                json.dump(policy, f, indent=4)
+            with open(self.trash_policy_config_path, 'wb') as f:
+                f.write(encode_policy(policy))
         except IOError as e:
             print(f"[File Manager] 错误: 无法保存回收站策略文件: {e}")
 
@@ -0,0 +1,59 @@
+import importlib.util
+import os
+from functools import partial
+
+import pytest
+
+LAUNCHER_PATH = os.path.join(os.path.dirname(__file__), '..', 'plugins', 'external_tool_launcher', 'launcher.py')
+
+
+def _load_launcher():
+    spec = importlib.util.spec_from_file_location("external_tool_launcher", LAUNCHER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as e:  # PyQt5 / 主程序的 plugin_system 不可用
+        pytest.skip(f"launcher 依赖不可用: {e}", allow_module_level=True)
+    return module
+
+
+launcher = _load_launcher()
+
+TOOL = "/usr/bin/praat"
+FILES = ["/tmp/a b.wav", "/tmp/c.wav"]
+
+
+def argv_for(template, filepaths=FILES):
+    resolve = partial(launcher.resolve_placeholder, tool_path=TOOL, filepaths=filepaths)
+    return launcher.build_command_argv(template, resolve, filepaths)
+
+
+@pytest.mark.parametrize("template, expected", [
+    # 单独成为一个参数的占位符
+    ('"{tool_path}"', [TOOL]),
+    ('{tool_path} {filepath}', [TOOL, FILES[0]]),
+    ('{tool_path} {filepath_quoted}', [TOOL, FILES[0]]),
+    ('{tool_path} {filepaths}', [TOOL] + FILES),
+    ('{tool_path} {filepaths_quoted}', [TOOL] + FILES),
+    ('"{tool_path}" --run script.praat {filepath_quoted}', [TOOL, "--run", "script.praat", FILES[0]]),
+    ('"{tool_path}" --open "{filepath}"', [TOOL, "--open", FILES[0]]),
+    # 与其他文本相连的占位符：拼接为一个参数，且不带字面引号
+    ('{tool_path} --tool={tool_path}', [TOOL, "--tool=" + TOOL]),
+    ('{tool_path} --file={filepath}', [TOOL, "--file=" + FILES[0]]),
+    ('{tool_path} --file={filepath_quoted}', [TOOL, "--file=" + FILES[0]]),
+    ('{tool_path} --files={filepaths}', [TOOL, "--files=" + " ".join(FILES)]),
+    ('{tool_path} --files={filepaths_quoted}', [TOOL, "--files=" + " ".join(FILES)]),
+])
+def test_build_command_argv_placeholders(template, expected):
+    assert argv_for(template) == expected
+
+
+def test_build_command_argv_keeps_special_characters_in_paths():
+    files = ['/tmp/it\'s "$HOME".wav']
+    assert argv_for('{tool_path} {filepaths_quoted}', files) == [TOOL] + files
+
+
+def test_windows_command_string_keeps_quotes():
+    resolve = partial(launcher.resolve_placeholder, tool_path=TOOL, filepaths=FILES)
+    segments = launcher.compile_command_template('"{tool_path}" --open {filepaths_quoted} {filepath_quoted}')
+    assert "".join(map(resolve, segments)) == f'"{TOOL}" --open "{FILES[0]}" "{FILES[1]}" "{FILES[0]}"'